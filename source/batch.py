@@ -0,0 +1,178 @@
+""" Headless generation of levels, used to gather statistics about the dungeons generated from many seeds.
+
+Run with `python -m source.batch --help`.
+
+Constants:
+    - FIELDS
+Functions:
+    - read_seeds
+    - generate_stats
+    - run
+    - main
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import Executor
+from csv import DictWriter
+from json import dumps
+from multiprocessing import Pool
+from os import listdir, cpu_count
+from random import Random
+from threading import Semaphore
+from typing import Iterator
+from source.level import Level
+from source.loot import ITEMS, LootTable
+from source.room import generate_rooms, create_room_pool
+
+
+FIELDS = ["seed", "difficulty", "maze_size", "rooms", "dead_ends", "stairs", "enemies", "items"]
+
+_loot_tables: list[LootTable] = []
+
+
+def read_seeds(path: str) -> Iterator[str]:
+    """ Reads seeds from a file, one per line, without loading the whole file.
+
+    :param path: The path of the file.
+    :return: The non-empty lines of the file.
+    """
+    with open(path, "r") as file:
+        for line in file:
+            seed = line.rstrip("\n")
+            if seed != "":
+                yield seed
+
+
+def _init_worker(items_path: str, loot_tables_path: str) -> None:
+    """ Loads the items and the loot tables in a worker process.
+
+    :param items_path: The path of the JSON file from which the items are loaded.
+    :param loot_tables_path: The path of the directory from which the loot tables are loaded.
+    """
+    ITEMS.load(items_path)
+    _loot_tables.clear()
+    _loot_tables.extend(LootTable(f"{loot_tables_path}/{file}", Random()) for file in sorted(listdir(loot_tables_path)) if file.split(".")[-1] == "json")
+
+
+def generate_stats(seed: str, levels: int, executor: Executor = None) -> list[dict]:
+    """ Generates the first levels of a game and their rooms, as the game would for a seed, and describes them.
+
+    :param seed: The seed of the game.
+    :param levels: The amount of levels to generate, starting from the first one.
+    :param executor: The pool in which the rooms of each level are generated, as created by create_room_pool. If
+    None, the rooms are generated in the current process.
+    :return: The statistics of every level. The enemies and items are counted in each room, in the order of the rooms
+    of the level.
+    """
+    generation_rng = Random()
+    generation_rng.seed(a=seed, version=2)
+    ai_rng = Random()
+
+    stats = []
+    for difficulty in range(1, levels + 1):
+        level = Level(difficulty, generation_rng)
+        loot_table = _loot_tables[difficulty - 1 if difficulty - 1 < len(_loot_tables) else -1]
+        rooms = generate_rooms(seed, level, loot_table, ai_rng, executor)
+
+        stats.append({
+            "seed": seed,
+            "difficulty": difficulty,
+            "maze_size": len(level.graph),
+            "rooms": len(level.rooms),
+            "dead_ends": sum(1 for position in level.graph if level.graph.degree(position) == 1),
+            "stairs": len(level.stairs),
+            "enemies": [len(rooms[position].enemies) for position in level.rooms],
+            "items": [len(rooms[position].items) for position in level.rooms]
+        })
+    return stats
+
+
+def _generate_stats(task: tuple[str, int]) -> list[dict]:
+    """ Unpacks a (seed, levels) task for generate_stats, as pools only pass a single argument. """
+    return generate_stats(*task)
+
+
+def _throttle(tasks: Iterator, slots: Semaphore) -> Iterator:
+    """ Yields tasks, taking a slot before each one, so that a pool's task feeder can't read them all ahead.
+
+    :param tasks: The tasks to yield.
+    :param slots: The slots, released once the result of a task has been used.
+    :return: The tasks.
+    """
+    for task in tasks:
+        slots.acquire()
+        yield task
+
+
+def run(seeds: Iterator[str], levels: int, output: str, workers: int = None, chunk_size: int = 16, items_path: str = "data/items.json", loot_tables_path: str = "data/loot_tables", room_workers: int = None) -> int:
+    """ Generates the levels of many seeds across a pool of processes, and writes their statistics as they come.
+
+    Results are written in the order of the seeds, one seed at a time, and only a few chunks of seeds per process are
+    sent to the pool ahead of the results being written, so that the memory used doesn't depend on the amount of seeds.
+
+    Seeds are spread across the pool by default. With room workers, the seeds are generated one after the other, and
+    the rooms of each level are spread across the pool instead, which suits a few seeds generated to high difficulties.
+
+    :param seeds: The seeds of the games to generate.
+    :param levels: The amount of levels to generate for each seed.
+    :param output: The path of the file to write to. It is written as JSON lines if it ends with ".jsonl", and as CSV
+    otherwise (the counts of each room being separated by spaces).
+    :param workers: The amount of processes, or None to use every CPU.
+    :param chunk_size: The amount of seeds sent to a process at once.
+    :param items_path: The path of the JSON file from which the items are loaded.
+    :param loot_tables_path: The path of the directory from which the loot tables are loaded.
+    :param room_workers: The amount of processes across which the rooms are spread, or None to spread the seeds.
+    :return: The amount of levels generated.
+    """
+    slots = None
+    if room_workers is None:
+        # The feeder of the pool reads the tasks as fast as it can, so it has to wait for results to be written.
+        slots = Semaphore(2 * chunk_size * (cpu_count() if workers is None else workers))
+        pool = Pool(workers, _init_worker, (items_path, loot_tables_path))
+        results = pool.imap(_generate_stats, _throttle(((seed, levels) for seed in seeds), slots), chunk_size)
+    else:
+        _init_worker(items_path, loot_tables_path)
+        pool = create_room_pool(room_workers, items_path)
+        results = (generate_stats(seed, levels, pool) for seed in seeds)
+
+    count = 0
+    with open(output, "w", newline="") as file, pool:
+        writer = None
+        if not output.endswith(".jsonl"):
+            writer = DictWriter(file, FIELDS)
+            writer.writeheader()
+
+        for stats in results:
+            for row in stats:
+                if writer is None:
+                    file.write(dumps(row) + "\n")
+                else:
+                    writer.writerow({**row, "enemies": " ".join(map(str, row["enemies"])), "items": " ".join(map(str, row["items"]))})
+            count += len(stats)
+            if slots is not None:
+                slots.release()
+    return count
+
+
+def main() -> None:
+    """
+    Parses the command line arguments and runs the batch.
+    """
+    parser = ArgumentParser(description="Generates the levels of many seeds without a display, and writes statistics about them.")
+    parser.add_argument("output", help="the file to write to, as CSV, or as JSON lines if it ends with .jsonl")
+    parser.add_argument("-l", "--levels", type=int, default=10, help="the amount of levels to generate per seed (default: 10)")
+    parser.add_argument("-s", "--seeds", default="data/seeds.txt", help="the file containing the seeds, one per line (default: data/seeds.txt)")
+    parser.add_argument("-n", "--limit", type=int, default=None, help="the maximum amount of seeds to read")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the amount of processes (default: every CPU)")
+    parser.add_argument("-r", "--room-workers", type=int, default=None, help="generate the seeds one after the other, and spread the rooms of each level across this amount of processes instead")
+    arguments = parser.parse_args()
+
+    seeds = read_seeds(arguments.seeds)
+    if arguments.limit is not None:
+        seeds = (seed for i, seed in zip(range(arguments.limit), seeds))
+
+    print(f"{run(seeds, arguments.levels, arguments.output, arguments.workers, room_workers=arguments.room_workers)} levels generated")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,16 @@ Classes:
 """
 
 from abc import abstractmethod
-from pygame import event, Surface
+from pygame import event, Surface, Rect
 from source.core.tools import Position
 
 
 class Component:
     """ A component represents a game element which is to be displayed on-screen, such as an UI element or the player
     representation.
+
+    Components are only rendered again when they changed: when their state (see `get_state`) or their area changed,
+    or when they were invalidated, for changes which their state doesn't describe.
     """
     def __init__(self, render_position: Position, render_width: int, render_height: int) -> None:
         """
@@ -23,6 +26,61 @@ class Component:
         self.render_width = render_width
         self.render_height = render_height
 
+        self.dirty = True
+        self.last_state: object = None
+        self.last_area: Rect = None
+
+    def invalidate(self) -> None:
+        """
+        Marks the component as changed, so that it is rendered again even if its state and its area are the same.
+        """
+        self.dirty = True
+
+    def get_rect(self) -> Rect:
+        """ Get the area of the surface covered by the component.
+
+        :return: The area covered by the component.
+        """
+        return Rect(self.render_position.x, self.render_position.y, self.render_width, self.render_height)
+
+    def get_state(self) -> object:
+        """ Get a description of how the component looks, to know if it has to be rendered again.
+
+        :return: A value equal to the previous one as long as the component looks the same, or None if the component
+        changes every frame.
+        """
+        return None
+
+    def get_dirty_rects(self) -> list[Rect]:
+        """ Get the areas of the surface which changed since the component was last rendered. The component is expected
+        to be rendered right after.
+
+        :return: The area the component covered and the one it covers now if it changed, nothing if it didn't.
+        """
+        state = self.get_state()
+        area = self.get_rect()
+        if not self.dirty and state is not None and state == self.last_state and area == self.last_area:
+            return []
+
+        rects = [area] if self.last_area is None else [self.last_area, area]
+        self.dirty = False
+        self.last_state = state
+        self.last_area = area
+        return rects
+
+    def get_hidden_rects(self) -> list[Rect]:
+        """ Get the areas of the surface to render again once the component isn't rendered anymore.
+
+        :return: The area the component last covered, if it was rendered since it was last hidden.
+        """
+        if self.last_area is None:
+            return []
+
+        rects = [self.last_area]
+        self.last_state = None
+        self.last_area = None
+        return rects
+
     @abstractmethod
     def update(self, events: list[event.Event]) -> None:
         """ Updates the component with the latest events.
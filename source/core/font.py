@@ -0,0 +1,42 @@
+""" Font-loading set of tools.
+
+Classes:
+    - FontBook
+"""
+
+from json import loads
+from pygame.font import Font
+
+
+class FontBook:
+    """
+    A registry of the fonts used in the game, loaded once for each path and size and shared by everything which renders
+    text.
+    """
+    def __init__(self) -> None:
+        self.book: dict[tuple[str, int], Font] = {}
+
+    def load(self, path: str) -> None:
+        """ Loads fonts in advance from a JSON file, giving the sizes in which each font is used.
+
+        :param path: The path of the JSON file to load the fonts from.
+        """
+        file = open(path, "r")
+        data: dict = loads(file.read())
+        file.close()
+
+        for font in data:
+            for size in data[font]:
+                self.get(font, size)
+
+    def get(self, path: str, size: int) -> Font:
+        """ Get a font from the registry, loading it if it wasn't already.
+
+        :param path: The path of the font file.
+        :param size: The size of the font.
+        :return: The font.
+        """
+        key = (path, size)
+        if key not in self.book:
+            self.book[key] = Font(path, size)
+        return self.book[key]
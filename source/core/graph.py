@@ -0,0 +1,365 @@
+""" A compact graph of positions, used to represent navigable areas.
+
+Classes:
+    - GridGraph
+"""
+
+from __future__ import annotations
+from array import array
+from source.core.tools import Position, Direction
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PRESENT = 0b10000
+COUNTS = [bin(mask).count("1") for mask in range(16)]
+OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+CODES = {offset: code for code, offset in enumerate(OFFSETS)}
+
+
+class GridGraph:
+    """
+    A graph in which every position is linked to some of its 4 neighbors. It is stored as a 2D array of cells, which
+    grows when positions are added outside of its bounds. Each cell holds a 4-bit mask of the directions in which the
+    position has a neighbor, and the order in which these neighbors were linked.
+
+    Positions are iterated in the order in which they were added, and neighbors are listed in the order in which they
+    were linked, as they would be in a dict of lists.
+    """
+    def __init__(self, x: int = 0, y: int = 0, width: int = 0, height: int = 0) -> None:
+        """
+        :param x: The x coordinate of the top-left corner of the initial bounds.
+        :param y: The y coordinate of the top-left corner of the initial bounds.
+        :param width: The initial width of the bounds.
+        :param height: The initial height of the bounds.
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+        self.masks = bytearray(width * height)
+        self.orders = bytearray(width * height)
+        self.order = array("i")
+        self.size = 0
+        self.stale = 0
+        self.version = 0
+
+    def __contains__(self, position: Position) -> bool:
+        index = self._index(position.x, position.y)
+        return index != -1 and self.masks[index] & PRESENT != 0
+
+    def __getitem__(self, position: Position) -> list[Position]:
+        index = self._index(position.x, position.y)
+        if index == -1 or self.masks[index] & PRESENT == 0:
+            raise KeyError(position)
+
+        neighbors = []
+        for i in range(COUNTS[self.masks[index] & 0b1111]):
+            offset = OFFSETS[(self.orders[index] >> (i * 2)) & 0b11]
+            neighbors.append(Position(position.x + offset[0], position.y + offset[1]))
+        return neighbors
+
+    def __iter__(self):
+        if self.stale:
+            self._compact()
+        for index in self.order:
+            yield Position(self.x + index % self.width, self.y + index // self.width)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def keys(self) -> list[Position]:
+        """ Get the positions of the graph.
+
+        :return: Every position of the graph, in the order in which they were added.
+        """
+        if self.stale:
+            self._compact()
+        x, y, width = self.x, self.y, self.width
+        return [Position(x + index % width, y + index // width) for index in self.order]
+
+    def add(self, position: Position) -> None:
+        """ Adds a position to the graph, without any neighbor. Nothing happens if it is already in the graph.
+
+        :param position: The position to add.
+        """
+        self._add(position.x, position.y)
+
+    def remove(self, position: Position) -> None:
+        """ Removes a position from the graph, along with every link towards it.
+
+        :param position: The position to remove.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1 or self.masks[index] & PRESENT == 0:
+            raise KeyError(position)
+
+        for direction in Direction:
+            neighbor = position.next_in_direction(direction)
+            if neighbor in self:
+                self.unlink(neighbor, direction.opposite())
+
+        self.masks[index] = 0
+        self.orders[index] = 0
+        self.size -= 1
+        self.stale += 1
+        self.version += 1
+
+    def link(self, position: Position, direction: Direction) -> None:
+        """ Adds the neighbor of a position in a direction to the position's neighbors. The link only goes one way.
+
+        :param position: The position from which the link starts, which must be in the graph.
+        :param direction: The direction of the neighbor to link.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1 or self.masks[index] & PRESENT == 0:
+            raise KeyError(position)
+        self._link(index, direction.value)
+
+    def unlink(self, position: Position, direction: Direction) -> None:
+        """ Removes the neighbor of a position in a direction from the position's neighbors.
+
+        :param position: The position from which the link starts, which must be in the graph.
+        :param direction: The direction of the neighbor to unlink.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1 or self.masks[index] & PRESENT == 0:
+            raise KeyError(position)
+        if not self.masks[index] & (1 << direction.value):
+            return
+
+        codes = [(self.orders[index] >> (i * 2)) & 0b11 for i in range(COUNTS[self.masks[index] & 0b1111])]
+        codes.remove(direction.value)
+        self.orders[index] = sum(code << (i * 2) for i, code in enumerate(codes))
+        self.masks[index] &= ~(1 << direction.value)
+        self.version += 1
+
+    def connect(self, first: Position, second: Position) -> None:
+        """ Links two adjacent positions to each other, adding them to the graph if needed.
+
+        :param first: A position.
+        :param second: A position next to the first one.
+        """
+        code = CODES[(second.x - first.x, second.y - first.y)]
+        first_index = self._add(first.x, first.y)
+        size = len(self.masks)
+        second_index = self._add(second.x, second.y)
+        if len(self.masks) != size:
+            first_index = self._index(first.x, first.y)
+
+        self._link(first_index, code)
+        self._link(second_index, (code + 2) % 4)
+
+    def has_edge(self, position: Position, direction: Direction) -> bool:
+        """ Get if a position is linked to its neighbor in a direction.
+
+        :param position: The position from which the link starts.
+        :param direction: The direction of the neighbor.
+        :return: True if the position is in the graph and linked to the neighbor, False if not.
+        """
+        index = self._index(position.x, position.y)
+        return index != -1 and self.masks[index] & PRESENT != 0 and self.masks[index] & (1 << direction.value) != 0
+
+    def degree(self, position: Position) -> int:
+        """ Get the amount of neighbors a position is linked to.
+
+        :param position: A position of the graph.
+        :return: The amount of neighbors of the position.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1 or self.masks[index] & PRESENT == 0:
+            raise KeyError(position)
+        return COUNTS[self.masks[index] & 0b1111]
+
+    def copy(self) -> GridGraph:
+        """ Get a copy of the graph.
+
+        :return: A new graph, with the same positions and links.
+        """
+        if self.stale:
+            self._compact()
+
+        graph = GridGraph(self.x, self.y, self.width, self.height)
+        graph.masks[:] = self.masks
+        graph.orders[:] = self.orders
+        graph.order.extend(self.order)
+        graph.size = self.size
+        return graph
+
+    @staticmethod
+    def from_grid(x: int, y: int, width: int, height: int, cells: object, margin: int = 0) -> GridGraph:
+        """ Creates a graph from a grid of cells, in which every present cell is linked to its present neighbors. The
+        positions are added column by column, and each one is linked to its neighbors in the order north, east, south,
+        west; as if they were added and linked one by one in nested loops over x then y.
+
+        The masks are derived from the whole grid at once when NumPy is available.
+
+        :param x: The x coordinate of the top-left cell of the grid.
+        :param y: The y coordinate of the top-left cell of the grid.
+        :param width: The width of the grid.
+        :param height: The height of the grid.
+        :param cells: The cells of the grid column by column (the cell at (i, j) is at index i * height + j), non-zero
+        if the position is present. When NumPy is available, it can also be an array of shape (width, height).
+        :param margin: The amount of empty cells to reserve around the grid, so that positions can be added there
+        without growing the graph.
+        :return: The created graph.
+        """
+        graph = GridGraph(x - margin, y - margin, width + margin * 2, height + margin * 2)
+        if numpy is not None:
+            graph._fill_vectorized(width, height, cells, margin)
+            return graph
+
+        for i in range(width):
+            column = i * height
+            for j in range(height):
+                if not cells[column + j]:
+                    continue
+
+                index = graph._add(x + i, y + j)
+                if j != 0 and cells[column + j - 1]:
+                    graph._link(index, Direction.NORTH.value)
+                if i != width - 1 and cells[column + height + j]:
+                    graph._link(index, Direction.EAST.value)
+                if j != height - 1 and cells[column + j + 1]:
+                    graph._link(index, Direction.SOUTH.value)
+                if i != 0 and cells[column - height + j]:
+                    graph._link(index, Direction.WEST.value)
+        return graph
+
+    @staticmethod
+    def direction_between(first: Position, second: Position) -> Direction:
+        """ Get the direction in which a position is from an adjacent one.
+
+        :param first: A position.
+        :param second: A position next to the first one.
+        :return: The direction in which the second position is from the first one.
+        """
+        return Direction(CODES[(second.x - first.x, second.y - first.y)])
+
+    def _fill_vectorized(self, width: int, height: int, cells: object, margin: int) -> None:
+        """ Fills an empty graph from a grid of cells using NumPy, as described in from_grid.
+
+        :param width: The width of the grid.
+        :param height: The height of the grid.
+        :param cells: The cells of the grid, column by column, or as an array of shape (width, height).
+        :param margin: The amount of empty cells around the grid.
+        """
+        if not isinstance(cells, numpy.ndarray):
+            cells = numpy.frombuffer(bytes(cells), dtype=numpy.uint8).reshape(width, height)
+        present = numpy.zeros((self.height, self.width), dtype=bool)
+        present[margin:margin + height, margin:margin + width] = cells.T != 0
+
+        neighbors = [numpy.zeros_like(present) for _ in Direction]
+        neighbors[Direction.NORTH.value][1:, :] = present[1:, :] & present[:-1, :]
+        neighbors[Direction.EAST.value][:, :-1] = present[:, :-1] & present[:, 1:]
+        neighbors[Direction.SOUTH.value][:-1, :] = present[:-1, :] & present[1:, :]
+        neighbors[Direction.WEST.value][:, 1:] = present[:, 1:] & present[:, :-1]
+
+        masks = present.astype(numpy.uint8) * PRESENT
+        orders = numpy.zeros_like(masks)
+        counts = numpy.zeros_like(masks)
+        for code, linked in enumerate(neighbors):
+            linked = linked.astype(numpy.uint8)
+            masks |= linked << code
+            orders |= (linked * code) << (counts * 2)
+            counts += linked
+
+        # Transposing makes NumPy list the present cells column by column.
+        columns, rows = numpy.nonzero(present.T)
+        self.masks = bytearray(masks.tobytes())
+        self.orders = bytearray(orders.tobytes())
+        self.order = array("i", (rows * self.width + columns).tolist())
+        self.size = len(self.order)
+        self.version += 1
+
+    def _index(self, x: int, y: int) -> int:
+        """ Get the index of the cell of a position.
+
+        :param x: The x coordinate of the position.
+        :param y: The y coordinate of the position.
+        :return: The index of the cell, or -1 if the position is out of bounds.
+        """
+        x -= self.x
+        y -= self.y
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
+
+    def _add(self, x: int, y: int) -> int:
+        """ Adds a position to the graph if it isn't already in it.
+
+        :param x: The x coordinate of the position.
+        :param y: The y coordinate of the position.
+        :return: The index of the cell of the position.
+        """
+        index = self._index(x, y)
+        if index == -1:
+            self._reserve(x, y)
+            index = self._index(x, y)
+
+        if not self.masks[index] & PRESENT:
+            if self.stale:
+                self._compact()
+            self.masks[index] = PRESENT
+            self.orders[index] = 0
+            self.order.append(index)
+            self.size += 1
+            self.version += 1
+        return index
+
+    def _link(self, index: int, code: int) -> None:
+        """ Links the cell at an index to its neighbor in a direction, if it isn't already.
+
+        :param index: The index of the cell.
+        :param code: The value of the direction of the neighbor.
+        """
+        mask = self.masks[index]
+        if not mask & (1 << code):
+            self.orders[index] |= code << (COUNTS[mask & 0b1111] * 2)
+            self.masks[index] = mask | (1 << code)
+            self.version += 1
+
+    def _reserve(self, x: int, y: int) -> None:
+        """ Grows the bounds of the graph so that they contain a position, with some room to spare.
+
+        :param x: The x coordinate of the position.
+        :param y: The y coordinate of the position.
+        """
+        if self._index(x, y) != -1:
+            return
+
+        margin_x = max(8, self.width // 2)
+        margin_y = max(8, self.height // 2)
+        left = self.x if x >= self.x else x - margin_x
+        top = self.y if y >= self.y else y - margin_y
+        right = self.x + self.width if x < self.x + self.width else x + 1 + margin_x
+        bottom = self.y + self.height if y < self.y + self.height else y + 1 + margin_y
+
+        width = right - left
+        masks = bytearray(width * (bottom - top))
+        orders = bytearray(width * (bottom - top))
+        for row in range(self.height):
+            start = (row + self.y - top) * width + self.x - left
+            masks[start:start + self.width] = self.masks[row * self.width:(row + 1) * self.width]
+            orders[start:start + self.width] = self.orders[row * self.width:(row + 1) * self.width]
+
+        self.order = array("i", [
+            (index // self.width + self.y - top) * width + index % self.width + self.x - left for index in self.order
+        ])
+        self.masks = masks
+        self.orders = orders
+        self.x = left
+        self.y = top
+        self.width = width
+        self.height = bottom - top
+
+    def _compact(self) -> None:
+        """
+        Removes the positions which were removed from the graph from the order of iteration.
+        """
+        self.order = array("i", [index for index in self.order if self.masks[index] & PRESENT])
+        self.stale = 0
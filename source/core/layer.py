@@ -5,13 +5,15 @@ Classes:
     - LayerManager
 """
 
-from pygame import Surface, SRCALPHA, event
+from pygame import Surface, SRCALPHA, Rect, event
 from source.core.component import Component
 
 
 class Layer:
     """
-    A layer is used to manage a group of component, to form a single "game state" or display of a scene.
+    A layer is used to manage a group of component, to form a single "game state" or display of a scene. The components
+    are rendered to a surface kept by the layer, so that only the components in the areas which changed have to be
+    rendered again.
     """
     def __init__(self, transparent: bool, width: int, height: int) -> None:
         """
@@ -32,6 +34,7 @@ class Layer:
 
         self.components: dict[str, Component] = {}
         self.locked: list[str] = []
+        self.hidden_rects: list[Rect] = []
 
     def add_component(self, name: str, component: Component) -> None:
         """ Adds a component on the layer.
@@ -39,6 +42,8 @@ class Layer:
         :param name: The name used to reference the added component.
         :param component: The component to add.
         """
+        if name in self.components:
+            self.hidden_rects.extend(self.components[name].get_hidden_rects())
         self.components[name] = component
 
     def get_component(self, name: str) -> Component:
@@ -53,7 +58,7 @@ class Layer:
 
         :param name: The name of the component.
         """
-        self.components.pop(name)
+        self.hidden_rects.extend(self.components.pop(name).get_hidden_rects())
 
     def lock_component(self, name: str) -> None:
         """ Block a component from rendering and updating.
@@ -77,6 +82,22 @@ class Layer:
         """
         self.locked.remove(name)
 
+    def get_dirty_rects(self) -> list[Rect]:
+        """ Get the areas of the layer which changed since it was last rendered: the areas of the components which
+        changed, appeared or disappeared. Layers which render components that they didn't add have to report their
+        areas as well. The layer is expected to be rendered right after.
+
+        :return: The areas of the layer to render again.
+        """
+        rects = self.hidden_rects
+        self.hidden_rects = []
+        for name in self.components:
+            if name in self.locked:
+                rects.extend(self.components[name].get_hidden_rects())
+            else:
+                rects.extend(self.components[name].get_dirty_rects())
+        return rects
+
     def update(self, events: list[event.Event]) -> None:
         """ Updates the components of the layer.
 
@@ -87,10 +108,14 @@ class Layer:
                 self.components[name].update(events)
 
     def render(self, surface: Surface) -> None:
-        """ Renders the components to a surface.
+        """ Renders the components to a surface. If the surface of the layer is clipped, only the clipped area is
+        cleared, and only the components which were last seen in it (see `get_dirty_rects`) are rendered again; the
+        rest of the surface is kept from the previous renders.
 
         :param surface: The surface on which every component will be rendered.
         """
+        area = self.surface.get_clip()
+        full = area == self.surface.get_rect()
         if self.transparent:
             self.surface.fill((0, 0, 0, 0))
         else:
@@ -98,7 +123,9 @@ class Layer:
 
         for name in self.components:
             if name not in self.locked:
-                self.components[name].render(self.surface)
+                component = self.components[name]
+                if full or component.last_area is None or component.last_area.colliderect(area):
+                    component.render(self.surface)
 
         surface.blit(self.surface, (0, 0))
 
@@ -111,6 +138,11 @@ class LayerManager:
         self.layers: dict[str, Layer] = {}
         self.order: list[str] = []
 
+        self.backdrop: Surface = None
+        self.backdrop_layers: list[Layer] = []
+        self.focused_layer: Layer = None
+        self.full_render = True
+
     def add_layer(self, name: str, layer: Layer) -> None:
         """ Adds a layer to the stack.
 
@@ -163,11 +195,23 @@ class LayerManager:
         """
         self.layers[self.order[0]].update(events)
 
-    def render(self, surface: Surface) -> None:
+    def invalidate(self) -> None:
+        """
+        Makes the whole surface render again on the next frame, for example when the window has been covered.
+        """
+        self.full_render = True
+
+    def render(self, surface: Surface) -> list[Rect]:
         """ Renders the layer in focus, and if it is transparent, each layer under it until a non-transparent layer is
         found or there are no more layers to render.
 
+        Only the layer in focus is updated, so the layers under it are rendered once to a backdrop, which is used as
+        long as they stay the same. Animated textures of those layers are therefore frozen while they are covered, such
+        as the room under the inventory or the pause menu. Only the areas in which the layer in focus changed are
+        rendered again.
+
         :param surface: The surface to which the layers will be rendered.
+        :return: The areas of the surface which were rendered again.
         """
         to_render: list[str] = []
         for name in self.order:
@@ -175,5 +219,35 @@ class LayerManager:
             if not self.layers[name].transparent:
                 break
 
-        for name in to_render:
-            self.layers[name].render(surface)
+        focused_layer = self.layers[to_render[-1]]
+        backdrop_layers = [self.layers[name] for name in to_render[:-1]]
+        if backdrop_layers != self.backdrop_layers:
+            self.backdrop_layers = backdrop_layers
+            self.backdrop = None
+            if backdrop_layers:
+                self.backdrop = Surface(surface.get_size())
+                for layer in backdrop_layers:
+                    layer.get_dirty_rects()
+                    layer.render(self.backdrop)
+            self.full_render = True
+
+        rects = focused_layer.get_dirty_rects()
+        if self.full_render or focused_layer is not self.focused_layer:
+            self.focused_layer = focused_layer
+            self.full_render = False
+            rects = [surface.get_rect()]
+
+        rects = [rect.clip(surface.get_rect()) for rect in rects]
+        rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+        if not rects:
+            return []
+
+        area = rects[0].unionall(rects[1:])
+        surface.set_clip(area)
+        focused_layer.surface.set_clip(area)
+        if self.backdrop is not None:
+            surface.blit(self.backdrop, (0, 0))
+        focused_layer.render(surface)
+        focused_layer.surface.set_clip(None)
+        surface.set_clip(None)
+        return rects
@@ -0,0 +1,240 @@
+""" Path-finding tools used to move entities inside of graphs.
+
+Classes:
+    - PathFinder
+    - DistanceField
+Constants:
+    - PATHS
+"""
+
+from collections import deque, OrderedDict
+from weakref import WeakKeyDictionary
+from source.core.tools import Position
+from source.core.graph import GridGraph
+
+
+class PathFinder:
+    """
+    Finds the shortest paths between positions of a graph, and keeps the paths it found in a cache which stays valid as
+    long as the graph they were found in is not changed (as told by its version). The connected components of the graphs
+    are labelled as well, so that knowing if a position can be reached from another doesn't require any search.
+
+    The paths and labels of a graph are only weakly tied to it: they are dropped along with the graph, and as soon as the
+    graph changes.
+    """
+    def __init__(self, cache_size: int = 4096) -> None:
+        """
+        :param cache_size: The maximum amount of (source, target) pairs for which a path is remembered, per graph.
+        """
+        self.cache_size = cache_size
+        self.cache: WeakKeyDictionary[GridGraph, tuple[int, OrderedDict[tuple[Position, Position], tuple[list[Position], int]]]] = WeakKeyDictionary()
+        self.labels: WeakKeyDictionary[GridGraph, tuple[int, dict[Position, int]]] = WeakKeyDictionary()
+
+    def connected(self, graph: GridGraph, source: Position, target: Position) -> bool:
+        """ Get if there is a path between two positions of a graph.
+
+        :param graph: The graph in which the path has to be found.
+        :param source: The position at which the path starts.
+        :param target: The position at which the path ends.
+        :return: True if both positions are in the same connected component of the graph, False if not.
+        """
+        labels = self._label(graph)
+        return source in labels and target in labels and labels[source] == labels[target]
+
+    def find_path(self, graph: GridGraph, source: Position, target: Position) -> list[Position]:
+        """ Get the shortest path between two positions of a graph.
+
+        :param graph: The graph in which the path has to be found.
+        :param source: The position at which the path starts.
+        :param target: The position at which the path ends.
+        :return: The positions to step on to go from the source to the target (the source excluded), or None if there
+        is no such path.
+        """
+        nodes, index = self._search(graph, source, target)
+        if nodes is None:
+            return None
+        return nodes[index + 1:]
+
+    def next_step(self, graph: GridGraph, source: Position, target: Position) -> Position:
+        """ Get the first step of the shortest path between two positions of a graph.
+
+        :param graph: The graph in which the path has to be found.
+        :param source: The position at which the path starts.
+        :param target: The position at which the path ends.
+        :return: The position to step on to get closer to the target, or None if there is no path or if the source is
+        the target.
+        """
+        nodes, index = self._search(graph, source, target)
+        if nodes is None or index + 1 >= len(nodes):
+            return None
+        return nodes[index + 1]
+
+    def _search(self, graph: GridGraph, source: Position, target: Position) -> tuple[list[Position], int]:
+        """ Get a path from the cache, or run a breadth-first search if it is not cached.
+
+        :param graph: The graph in which the path has to be found.
+        :param source: The position at which the path starts.
+        :param target: The position at which the path ends.
+        :return: A list of positions going from some position to the target, and the index of the source inside of it;
+        or None and -1 if there is no path.
+        """
+        paths = self._get_paths(graph)
+        if (source, target) in paths:
+            paths.move_to_end((source, target))
+            return paths[(source, target)]
+
+        if not self.connected(graph, source, target):
+            return None, -1
+
+        parents: dict[Position, Position] = {source: None}
+        opened = deque([source])
+        while opened and target not in parents:
+            current = opened.popleft()
+            for neighbor in graph[current]:
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    opened.append(neighbor)
+                    if neighbor == target:
+                        break
+
+        nodes = [target]
+        while parents[nodes[-1]] is not None:
+            nodes.append(parents[nodes[-1]])
+        nodes.reverse()
+
+        # Every position along the path leads to the target through the rest of the path.
+        for i in range(len(nodes) - 1):
+            self._store(paths, (nodes[i], target), (nodes, i))
+
+        return nodes, 0
+
+    def _label(self, graph: GridGraph) -> dict[Position, int]:
+        """ Get the labels of the connected components of a graph, and labels them if it wasn't already done.
+
+        :param graph: The graph of which the components have to be labelled.
+        :return: The label of the component of every position of the graph.
+        """
+        if graph in self.labels and self.labels[graph][0] == graph.version:
+            return self.labels[graph][1]
+
+        labels: dict[Position, int] = {}
+        label = 0
+        for position in graph:
+            if position in labels:
+                continue
+
+            label += 1
+            labels[position] = label
+            opened = [position]
+            while opened:
+                current = opened.pop()
+                for neighbor in graph[current]:
+                    if neighbor not in labels:
+                        labels[neighbor] = label
+                        opened.append(neighbor)
+
+        self.labels[graph] = (graph.version, labels)
+        return labels
+
+    def _get_paths(self, graph: GridGraph) -> OrderedDict[tuple[Position, Position], tuple[list[Position], int]]:
+        """ Get the paths cached for the current version of a graph, dropping those of its previous versions.
+
+        :param graph: The graph in which the paths were found.
+        :return: The cached paths, by (source, target) pair, from the least to the most recently used.
+        """
+        if graph not in self.cache or self.cache[graph][0] != graph.version:
+            self.cache[graph] = (graph.version, OrderedDict())
+        return self.cache[graph][1]
+
+    def _store(self, paths: OrderedDict[tuple[Position, Position], tuple[list[Position], int]], key: tuple[Position, Position], entry: tuple[list[Position], int]) -> None:
+        """ Adds an entry to the paths cached for a graph, and evicts the least recently used entries if there are too
+        many.
+
+        :param paths: The paths cached for the graph.
+        :param key: The source and target of the path.
+        :param entry: The path and the index of the source inside of it.
+        """
+        paths[key] = entry
+        paths.move_to_end(key)
+        while len(paths) > self.cache_size:
+            paths.popitem(last=False)
+
+
+class DistanceField:
+    """
+    The distances from every position of a graph to a single root position. Any amount of entities can step towards
+    the root by following the field, without having to search for a path each. The distances are only computed when
+    the field is followed, so moving the root of a field which nothing follows is free.
+    """
+    def __init__(self, graph: GridGraph) -> None:
+        """
+        :param graph: The graph over which the field is spread.
+        """
+        self.graph = graph
+        self.root: Position = None
+        self.computed_root: Position = None
+        self.version = -1
+        self.distances: dict[Position, int] = {}
+
+    def update(self, root: Position) -> None:
+        """ Moves the root of the field. The distances are computed again the next time the field is followed, and
+        only if the root or the graph has changed.
+
+        :param root: The position towards which the field leads.
+        """
+        self.root = root
+
+    def _compute(self) -> dict[Position, int]:
+        """ Get the distances to the root of the field, and computes them again if they are out of date.
+
+        :return: The amount of steps to the root from every position which can reach it.
+        """
+        if self.computed_root is not None and self.computed_root == self.root and self.version == self.graph.version:
+            return self.distances
+
+        self.computed_root = self.root
+        self.version = self.graph.version
+        self.distances = {}
+        if self.root is None or self.root not in self.graph:
+            return self.distances
+
+        self.distances[self.root] = 0
+        opened = deque([self.root])
+        while opened:
+            current = opened.popleft()
+            for neighbor in self.graph[current]:
+                if neighbor not in self.distances:
+                    self.distances[neighbor] = self.distances[current] + 1
+                    opened.append(neighbor)
+        return self.distances
+
+    def distance(self, position: Position) -> int:
+        """ Get the amount of steps between a position and the root of the field.
+
+        :param position: The position of which the distance to the root will be determined.
+        :return: The amount of steps to the root, or -1 if the root can't be reached from the position.
+        """
+        distances = self._compute()
+        if position not in distances:
+            return -1
+        return distances[position]
+
+    def next_step(self, position: Position) -> Position:
+        """ Get the neighbor of a position which is the closest to the root.
+
+        :param position: The position from which to step.
+        :return: The position to step on to get closer to the root, or None if the root can't be reached or if the
+        position is the root.
+        """
+        distances = self._compute()
+        if position not in distances:
+            return None
+
+        best = None
+        for neighbor in self.graph[position]:
+            if neighbor in distances and distances[neighbor] < distances[position if best is None else best]:
+                best = neighbor
+        return best
+
+
+PATHS = PathFinder()
@@ -3,15 +3,20 @@
 Classes:
     - TextureType
     - Texture
+    - TextureAtlas
     - TextureBook
 """
 
-from json import loads
+from json import loads, dumps
 from enum import Enum
+from hashlib import sha1
+from mmap import mmap, ACCESS_COPY
+from os import path as os_path, makedirs, replace, remove
 from time import time
 from math import floor
 from copy import copy
-from pygame import Surface, image, transform, Rect, event
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from pygame import Surface, image, transform, Rect, event, SRCALPHA, BLEND_RGBA_MAX
 from source.core.tools import Position, Direction
 from source.core.component import Component
 
@@ -26,64 +31,236 @@ class TextureType(Enum):
 
 class Texture:
     """
-    A texture which can be loaded from a file and rendered on a surface.
+    A texture which can be loaded from a file and rendered on a surface. Rotations of the texture are made the first
+    time they are rendered. The rotations of directional textures which are already cached are mapped when the texture
+    is loaded, so that they can be packed along with it. The frames of animated textures are cut once per rotation, and the current frame is only computed once per frame of the
+    game, from the time sampled by `Texture.tick`.
+
+    If `Texture.CachePath` is set, the scaled surfaces and their rotations are stored there as raw pixels, in one file
+    per image and rotation. The modification time of the image and the scale are written in the file, and the file is
+    overwritten when they change. Cached surfaces are mapped back into memory on the next loads instead of decoding,
+    scaling and rotating the image again. A damaged file is removed and treated as if there was none.
     """
     UIScale = 1.0
     TileSize = 48
+    Time = 0.0
+    CachePath: str = None
 
-    def __init__(self, path: str, texture_type: TextureType, animated: bool = False, animation_duration: float = 1.0, frame_count: int = 1, loop_animation: bool = False) -> None:
+    def __init__(self, path: str, texture_type: TextureType, animated: bool = False, animation_duration: float = 1.0, frame_count: int = 1, loop_animation: bool = False, directional: bool = False) -> None:
         """
         :param path: The path of the image to load.
         :param texture_type: The type of the texture; this will determine how it is loaded.
         :param animated: If the texture must play an animation.
         :param animation_duration: The duration in seconds of the animation cycle.
         :param loop_animation: If the animation must repeat once it ends.
+        :param directional: If the texture is rendered in every direction, so that its cached rotations are loaded in
+        advance.
         """
         self.path = path
         self.surfaces: dict[Direction, Surface] = {}
+        self.frames: dict[Direction, list[Surface]] = {}
+        self.width = 0
+        self.height = 0
         self.texture_type = texture_type
+        self.directional = directional
 
         self.animated = animated
         self.animation_duration = animation_duration
         self.frame_count = frame_count
         self.loop_animation = loop_animation
         self.animation_start = -1
+        self.frame_time = -1.0
+        self.frame = 0
 
         self.load()
+        if self.directional:
+            for direction in Direction:
+                if direction not in self.surfaces:
+                    rotated = self._load_cached(direction)
+                    if rotated is not None:
+                        self.use({direction: rotated})
+
+    @staticmethod
+    def tick(now: float = None) -> None:
+        """ Samples the time at which the animations are shown, once per frame of the game.
+
+        :param now: The time to use, or None for the current time.
+        """
+        Texture.Time = time() if now is None else now
 
     def load(self) -> None:
         """
         Loads the texture from the path specified at initialization.
         """
-        original: Surface = image.load(self.path)
-        if self.texture_type == TextureType.UI:
-            original = transform.scale(
-                original,
-                (int(original.get_width() * Texture.UIScale), int(original.get_height() * Texture.UIScale))
-            )
-        elif self.texture_type == TextureType.TILE:
-            original = transform.scale(
-                original,
-                (Texture.TileSize, int(original.get_height() / original.get_width() * Texture.TileSize))
-            )
+        original = self._load_cached(Direction.NORTH)
+        if original is None:
+            original = image.load(self.path)
+            if self.texture_type == TextureType.UI:
+                original = transform.scale(
+                    original,
+                    (int(original.get_width() * Texture.UIScale), int(original.get_height() * Texture.UIScale))
+                )
+            elif self.texture_type == TextureType.TILE:
+                original = transform.scale(
+                    original,
+                    (Texture.TileSize, int(original.get_height() / original.get_width() * Texture.TileSize))
+                )
+            self._store_cached(Direction.NORTH, original)
+
+        self.surfaces = {Direction.NORTH: original}
+        self.width = original.get_width()
+        self.height = original.get_height() // self.frame_count if self.animated else original.get_height()
+        self.frames = {Direction.NORTH: self._cut_frames(Direction.NORTH)}
+
+    def rotate(self, direction: Direction) -> None:
+        """ Makes the rotation of the texture towards a direction, if it wasn't already made, or loads it from the
+        cache.
+
+        :param direction: The direction of the rotation.
+        """
+        if direction in self.surfaces:
+            return
+
+        rotated = self._load_cached(direction)
+        if rotated is None:
+            rotated = transform.rotate(self.surfaces[Direction.NORTH], -90 * direction.value)
+            self._store_cached(direction, rotated)
+        self.surfaces[direction] = rotated
+        self.frames[direction] = self._cut_frames(direction)
+
+    def _get_cache_file(self, direction: Direction) -> tuple[str, str]:
+        """ Get the file in which a rotation of the texture is cached, and the key which the file must contain for the
+        cached rotation to be up to date.
+
+        :param direction: The direction of the rotation.
+        :return: The path of the file and the key, or None and None if there is no cache or if the image can't be
+        found.
+        """
+        if Texture.CachePath is None or not os_path.isfile(self.path):
+            return None, None
+        name = f"{os_path.abspath(self.path)}|{self.texture_type.name}|{direction.name}"
+        key = f"{os_path.getmtime(self.path)}|{Texture.UIScale}|{Texture.TileSize}"
+        return os_path.join(Texture.CachePath, f"{sha1(name.encode()).hexdigest()}.bin"), key
+
+    def _load_cached(self, direction: Direction) -> Surface:
+        """ Maps a cached rotation of the texture into memory. A file which can't be read is removed.
+
+        :param direction: The direction of the rotation.
+        :return: The surface, which uses the mapped pixels, or None if the rotation isn't cached or is out of date.
+        """
+        file_path, key = self._get_cache_file(direction)
+        if file_path is None or not os_path.isfile(file_path):
+            return None
+
+        try:
+            with open(file_path, "rb") as file:
+                header = loads(file.readline())
+                if header["key"] != key:
+                    return None
+                data = mmap(file.fileno(), 0, access=ACCESS_COPY)
+
+            width, height = header["size"]
+            if len(data) - header["offset"] != width * height * len(header["format"]):
+                raise ValueError(f"{file_path} doesn't contain {width}x{height} {header['format']} pixels")
+            surface = image.frombuffer(memoryview(data)[header["offset"]:], (width, height), header["format"])
+            if header["colorkey"] is not None:
+                surface.set_colorkey(header["colorkey"])
+        except (ValueError, KeyError, TypeError, OSError):
+            try:
+                remove(file_path)
+            except OSError:
+                pass
+            return None
+        return surface
+
+    def _store_cached(self, direction: Direction, surface: Surface) -> None:
+        """ Writes a rotation of the texture to the cache, as raw pixels after a line describing them.
+
+        :param direction: The direction of the rotation.
+        :param surface: The surface of the rotation.
+        """
+        file_path, key = self._get_cache_file(direction)
+        if file_path is None:
+            return
+
+        pixel_format = "RGBA" if surface.get_flags() & SRCALPHA else "RGB"
+        colorkey = surface.get_colorkey()
+        header = {"key": key, "size": surface.get_size(), "format": pixel_format, "colorkey": None if colorkey is None else list(colorkey), "offset": 0}
+        # The offset is part of the header, so its length is reserved before it is known.
+        header["offset"] = len(dumps(header)) + 8
+        line = dumps(header).ljust(header["offset"] - 1) + "\n"
 
-        self.surfaces = {Direction(i): transform.rotate(original, -90 * i) for i in range(4)}
+        makedirs(Texture.CachePath, exist_ok=True)
+        with open(file_path + ".tmp", "wb") as file:
+            file.write(line.encode())
+            file.write(image.tobytes(surface, pixel_format))
+        replace(file_path + ".tmp", file_path)
+
+    def use(self, surfaces: dict[Direction, Surface]) -> None:
+        """ Replaces the rotations of the texture by copies of them, like views of an atlas, and cuts the frames again.
+
+        :param surfaces: The new surface of the rotations which were made, of the same size as the previous ones.
+        """
+        self.surfaces.update(surfaces)
+        for direction in surfaces:
+            self.frames[direction] = self._cut_frames(direction)
+
+    def _cut_frames(self, direction: Direction) -> list[Surface]:
+        """ Cuts the frames of the texture out of one of its rotations. The frames are stacked from top to bottom in
+        the original image, so they follow the rotation.
+
+        :param direction: The direction of the rotation.
+        :return: The frames of the texture in that direction, in the order in which they are played.
+        """
+        rotated = self.surfaces[direction]
+        if not self.animated:
+            return [rotated]
+
+        last = self.frame_count - 1
+        if direction == Direction.NORTH:
+            rects = [Rect(0, i * self.height, self.width, self.height) for i in range(self.frame_count)]
+        elif direction == Direction.EAST:
+            rects = [Rect((last - i) * self.height, 0, self.height, self.width) for i in range(self.frame_count)]
+        elif direction == Direction.SOUTH:
+            rects = [Rect(0, (last - i) * self.height, self.width, self.height) for i in range(self.frame_count)]
+        else:
+            rects = [Rect(i * self.height, 0, self.height, self.width) for i in range(self.frame_count)]
+        return [rotated.subsurface(rect) for rect in rects]
 
     def get_width(self) -> int:
         """ Get the width of the texture.
 
         :return: The width of the texture.
         """
-        return list(self.surfaces.values())[0].get_width()
+        return self.width
 
     def get_height(self) -> int:
         """ Get the height of the texture.
 
         :return: The height of the texture.
         """
-        if self.animated:
-            return list(self.surfaces.values())[0].get_height() // self.frame_count
-        return list(self.surfaces.values())[0].get_height()
+        return self.height
+
+    def get_frame(self) -> int:
+        """ Get the frame of the animation shown at the last tick, starting the animation if it wasn't already.
+
+        :return: The index of the current frame.
+        """
+        if self.frame_time == Texture.Time:
+            return self.frame
+        self.frame_time = Texture.Time
+
+        if self.animation_start == -1:
+            self.animation_start = Texture.Time
+
+        elapsed = Texture.Time - self.animation_start
+        if self.loop_animation:
+            self.frame = floor(self.frame_count / self.animation_duration * (elapsed % self.animation_duration)) % self.frame_count
+        elif elapsed < self.animation_duration:
+            self.frame = floor(self.frame_count / self.animation_duration * elapsed % self.frame_count)
+        else:
+            self.frame = 0
+        return self.frame
 
     def render(self, surface: Surface, position: Position, direction: Direction = Direction.NORTH) -> None:
         """ Renders the texture to the specified surface.
@@ -92,34 +269,13 @@ class Texture:
         :param position: The position on the surface where the texture will be rendered.
         :param direction: The direction towards which the texture will be oriented.
         """
+        if direction not in self.surfaces:
+            self.rotate(direction)
+
         if not self.animated:
             surface.blit(self.surfaces[direction], (position.x, position.y))
-            return
-
-        if self.animation_start == -1:
-            self.animation_start = time()
-
-        frame = 0
-        if self.loop_animation:
-            frame = floor(self.frame_count / self.animation_duration * ((time() - self.animation_start) % self.animation_duration)) % self.frame_count
-        elif time() - self.animation_start < self.animation_duration:
-            frame = floor(self.frame_count / self.animation_duration * (time() - self.animation_start) % self.frame_count)
-
-        frame_rect = Rect(0, 0, self.get_width(), self.get_height())
-        if direction == Direction.NORTH:
-            frame_rect.y = frame * self.get_height()
-        elif direction == Direction.EAST:
-            frame_rect.x = (self.get_height() * self.frame_count - self.get_height()) - frame * self.get_height()
-            frame_rect.w = self.get_height()
-            frame_rect.h = self.get_width()
-        elif direction == Direction.SOUTH:
-            frame_rect.y = (self.get_height() * self.frame_count - self.get_height()) - frame * self.get_height()
-        elif direction == Direction.WEST:
-            frame_rect.x = frame * self.get_height()
-            frame_rect.w = self.get_height()
-            frame_rect.h = self.get_width()
-
-        surface.blit(self.surfaces[direction], (position.x, position.y), frame_rect)
+        else:
+            surface.blit(self.frames[direction][self.get_frame()], (position.x, position.y))
 
 
 class TextureComponent(Component):
@@ -130,6 +286,11 @@ class TextureComponent(Component):
         super().__init__(render_position, texture.get_width(), texture.get_height())
         self.texture = texture
 
+    def get_state(self) -> object:
+        if self.texture.animated:
+            return None
+        return self.texture
+
     def update(self, events: list[event.Event]) -> None:
         pass
 
@@ -137,17 +298,100 @@ class TextureComponent(Component):
         self.texture.render(surface, self.render_position)
 
 
+class TextureAtlas:
+    """
+    Large surfaces (pages) in the pixel format of the display, into which many small surfaces are copied, so that
+    blitting them doesn't require any conversion. The surfaces are packed in rows, from the tallest to the shortest, and
+    those which don't fit in a page get one of their own.
+    """
+    PageSize = 2048
+
+    def __init__(self, alpha: bool = False, colorkey: tuple[int, int, int, int] = None) -> None:
+        """
+        :param alpha: If the pages keep the alpha channel of the surfaces.
+        :param colorkey: The color key shared by the surfaces, if they are transparent through a color key.
+        """
+        self.alpha = alpha
+        self.colorkey = colorkey
+        self.pages: list[Surface] = []
+
+    def pack(self, surfaces: list[Surface]) -> list[Surface]:
+        """ Copies surfaces into new pages of the atlas. The display mode must be set.
+
+        :param surfaces: The surfaces to copy.
+        :return: A view (subsurface) of the atlas for every surface, in the same order.
+        """
+        spots: list[tuple[int, int, int]] = [(0, 0, 0)] * len(surfaces)
+        sizes: list[list[int]] = []
+        shelf_x = shelf_y = shelf_height = 0
+        for i in sorted(range(len(surfaces)), key=lambda k: (-surfaces[k].get_height(), -surfaces[k].get_width())):
+            width, height = surfaces[i].get_size()
+            if width > TextureAtlas.PageSize or height > TextureAtlas.PageSize:
+                spots[i] = (len(sizes), 0, 0)
+                sizes.append([width, height])
+                # The next surfaces start a new page, as this one is full.
+                shelf_x, shelf_y, shelf_height = TextureAtlas.PageSize, TextureAtlas.PageSize, 0
+                continue
+
+            if shelf_x + width > TextureAtlas.PageSize:
+                shelf_x, shelf_y, shelf_height = 0, shelf_y + shelf_height, 0
+            if not sizes or shelf_y + height > TextureAtlas.PageSize:
+                sizes.append([0, 0])
+                shelf_x, shelf_y, shelf_height = 0, 0, 0
+
+            spots[i] = (len(sizes) - 1, shelf_x, shelf_y)
+            sizes[-1][0] = max(sizes[-1][0], shelf_x + width)
+            sizes[-1][1] = max(sizes[-1][1], shelf_y + height)
+            shelf_x += width
+            shelf_height = max(shelf_height, height)
+
+        first = len(self.pages)
+        for width, height in sizes:
+            if self.alpha:
+                page = Surface((width, height), SRCALPHA).convert_alpha()
+                page.fill((0, 0, 0, 0))
+            else:
+                page = Surface((width, height)).convert()
+                if self.colorkey is not None:
+                    page.fill(self.colorkey)
+                    page.set_colorkey(self.colorkey)
+            self.pages.append(page)
+
+        views = []
+        for surface, (page, x, y) in zip(surfaces, spots):
+            page = self.pages[first + page]
+            if self.alpha:
+                # Taking the maximum with a transparent page copies the pixels as they are, instead of blending them.
+                page.blit(surface.convert_alpha(), (x, y), special_flags=BLEND_RGBA_MAX)
+            else:
+                page.blit(surface, (x, y))
+            views.append(page.subsurface(Rect(x, y, surface.get_width(), surface.get_height())))
+        return views
+
+
 class TextureBook:
     """
     A collection of textures, which can be loaded from a JSON file.
+
+    Textures can be loaded in the background by a pool of threads. Until they are loaded, they are pending: getting a
+    pending texture waits for it, or loads it right away if no thread has started loading it yet. The other textures
+    are added to the book as they are needed, or all at once when they are all loaded (see `poll`). Textures which are
+    to be packed are only packed once none is pending anymore, all together, so that they share as few atlases as if
+    they had been loaded right away.
     """
     def __init__(self) -> None:
         self.book: dict[str, Texture] = {}
+        self.atlases: list[TextureAtlas] = []
+        self.pending: dict[str, tuple[Future, tuple, bool]] = {}
+        self.unpacked: list[Texture] = []
+        self.executor: ThreadPoolExecutor = None
 
-    def load(self, path: str) -> None:
+    def load(self, path: str, atlas: bool = False, workers: int = 0) -> None:
         """ Loads textures from a JSON file.
 
         :param path: the path of the JSON file to load the textures from.
+        :param atlas: If the textures must be packed into atlases in the pixel format of the display, which must be set.
+        :param workers: The amount of threads loading the textures in the background, or 0 to load them right away.
         """
         file = open(path, "r")
         data: dict = loads(file.read())
@@ -159,16 +403,96 @@ class TextureBook:
                 texture_type = TextureType.UI
 
             if "animated" in data[texture] and data[texture]["animated"]:
-                self.book[texture] = Texture(
+                arguments = (
                     data[texture]["path"],
                     texture_type,
                     data[texture]["animated"],
                     data[texture]["animation_duration"],
                     data[texture]["frame_count"],
-                    data[texture]["loop_animation"]
+                    data[texture]["loop_animation"],
+                    data[texture].get("directional", False)
                 )
             else:
-                self.book[texture] = Texture(data[texture]["path"], texture_type)
+                arguments = (data[texture]["path"], texture_type, False, 1.0, 1, False, data[texture].get("directional", False))
+
+            if workers > 0:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=workers)
+                self.pending[texture] = (self.executor.submit(Texture, *arguments), arguments, atlas)
+            else:
+                self.book[texture] = Texture(*arguments)
+
+        if atlas and workers == 0:
+            self.pack([self.book[texture] for texture in data])
+
+    def poll(self) -> None:
+        """
+        Adds the pending textures to the book once they are all loaded, packing them together.
+        """
+        if self.pending and all(future.done() for future, _, _ in self.pending.values()):
+            self._finish(list(self.pending))
+
+    def wait(self) -> None:
+        """
+        Waits for every pending texture to be loaded, and adds them to the book.
+        """
+        if self.pending:
+            wait([future for future, _, _ in self.pending.values()])
+            self._finish(list(self.pending))
+
+    def _finish(self, names: list[str]) -> None:
+        """ Adds pending textures to the book, loading those which weren't started yet on the current thread. Once
+        none is pending anymore, the textures to pack are packed together.
+
+        :param names: The names of the pending textures.
+        """
+        for name in names:
+            future, arguments, atlas = self.pending.pop(name)
+            self.book[name] = Texture(*arguments) if future.cancel() else future.result()
+            if atlas:
+                self.unpacked.append(self.book[name])
+
+        if not self.pending:
+            if self.unpacked:
+                self.pack(self.unpacked)
+                self.unpacked = []
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+    def pack(self, textures: list[Texture]) -> None:
+        """ Packs the rotations made of some textures into new atlases, one for each kind of transparency: opaque textures,
+        textures with an alpha channel, and textures with each color key (which are much faster to blit than if they had
+        an alpha channel).
+
+        :param textures: The textures to pack.
+        """
+        groups: dict[object, list[Texture]] = {}
+        for texture in textures:
+            groups.setdefault(self._get_transparency(texture), []).append(texture)
+
+        for transparency, packed in groups.items():
+            if transparency == "alpha":
+                atlas = TextureAtlas(alpha=True)
+            else:
+                atlas = TextureAtlas(colorkey=transparency)
+            rotations = [(texture, direction) for texture in packed for direction in list(texture.surfaces)]
+            views = atlas.pack([texture.surfaces[direction] for texture, direction in rotations])
+            for (texture, direction), view in zip(rotations, views):
+                texture.use({direction: view})
+            self.atlases.append(atlas)
+
+    @staticmethod
+    def _get_transparency(texture: Texture) -> object:
+        """ Get how a texture is transparent.
+
+        :param texture: The texture.
+        :return: "alpha" if the texture has an alpha channel, its color key if it has one, or None if it is opaque.
+        """
+        surface = texture.surfaces[Direction.NORTH]
+        if surface.get_flags() & SRCALPHA:
+            return "alpha"
+        return surface.get_colorkey()
 
     def add(self, name: str, texture: Texture) -> None:
         """ Adds a texture to the book.
@@ -179,11 +503,16 @@ class TextureBook:
         self.book[name] = texture
 
     def get(self, name: str) -> Texture:
-        """ Get a texture from the book.
+        """ Get a texture from the book. Looping animations are shared, so that they are all in sync, but animations
+        which are only played once are copied so that each starts when it is first shown (the frames are still shared).
 
         :param name: The name of the desired texture.
         :return: The texture corresponding to the given name.
         """
-        if self.book[name].animated:
+        if name in self.pending:
+            # The textures which are already loaded are added along, so that fewer are left pending.
+            self._finish([other for other in self.pending if other == name or self.pending[other][0].done()])
+
+        if self.book[name].animated and not self.book[name].loop_animation:
             return copy(self.book[name])
         return self.book[name]
@@ -0,0 +1,134 @@
+""" Pre-rendering of the static tiles of a map.
+
+Classes:
+    - TileMap
+"""
+
+from collections import OrderedDict
+from math import ceil, floor
+from typing import Callable
+from pygame import Surface, Rect
+from source.core.tools import Position, Direction
+from source.core.texture import Texture
+
+
+class TileMap:
+    """
+    The static tiles of a map, pre-rendered in square chunks of tiles which are blitted as a whole. Chunks are rendered
+    the first time they are in view, and the least recently used ones are dropped once there are too many. Every chunk
+    outside of the bounds of the map is filled with the same background tile, and shares a single surface. Chunks are
+    in the pixel format of the display, so that blitting them doesn't convert any pixel.
+    """
+    ChunkSize = 8
+
+    def __init__(self, source: object, bounds: Rect, tile: Callable[[int, int], tuple[Texture, Direction]], background: Texture, cache_size: int = 64) -> None:
+        """
+        :param source: The map (level, room...) from which the tiles come, to know when the tile map is out of date.
+        :param bounds: The tiles covered by the map, any tile outside of them is the background tile.
+        :param tile: A function giving the static texture of the tile at some coordinates, and its orientation.
+        :param background: The texture of the tiles outside of the bounds.
+        :param cache_size: The amount of chunks kept when they are out of view.
+        """
+        self.source = source
+        self.bounds = bounds
+        self.tile = tile
+        self.background = background
+        self.cache_size = cache_size
+
+        self.tile_size = Texture.TileSize
+        self.chunks: OrderedDict[tuple[int, int], Surface] = OrderedDict()
+        self.background_chunk: Surface = None
+
+    @staticmethod
+    def get_view(center: Position, render_position: Position, render_width: int, render_height: int) -> tuple[Position, Rect]:
+        """ Get where the tiles are rendered, for the view of a map centered on a tile. An odd amount of tiles covering
+        the render area is shown, so that the center tile is right in the middle.
+
+        :param center: The tile at the center of the view.
+        :param render_position: The position of the top-left corner of the render area.
+        :param render_width: The width of the render area.
+        :param render_height: The height of the render area.
+        :return: The position of the top-left corner of the tile at (0, 0), and the area covered by the shown tiles.
+        """
+        width_blocks: int = ceil(render_width / Texture.TileSize)
+        if width_blocks % 2 == 0:
+            width_blocks += 1
+        height_blocks: int = ceil(render_height / Texture.TileSize)
+        if height_blocks % 2 == 0:
+            height_blocks += 1
+
+        area = Rect(
+            render_position.x - (width_blocks * Texture.TileSize - render_width) // 2,
+            render_position.y - (height_blocks * Texture.TileSize - render_height) // 2,
+            width_blocks * Texture.TileSize,
+            height_blocks * Texture.TileSize
+        )
+        origin = Position(
+            area.x - (center.x - floor(width_blocks / 2)) * Texture.TileSize,
+            area.y - (center.y - floor(height_blocks / 2)) * Texture.TileSize
+        )
+        return origin, area
+
+    def render(self, surface: Surface, origin: Position, area: Rect) -> None:
+        """ Renders the chunks visible inside of an area of a surface.
+
+        :param surface: The surface on which to render the map.
+        :param origin: The position on the surface of the top-left corner of the tile at (0, 0).
+        :param area: The area of the surface covered by the map; nothing is rendered outside of it.
+        """
+        if self.tile_size != Texture.TileSize:
+            self.tile_size = Texture.TileSize
+            self.chunks.clear()
+            self.background_chunk = None
+
+        span = TileMap.ChunkSize * self.tile_size
+        first_x = (area.left - origin.x) // span
+        first_y = (area.top - origin.y) // span
+        last_x = (area.right - 1 - origin.x) // span
+        last_y = (area.bottom - 1 - origin.y) // span
+
+        clip = surface.get_clip()
+        surface.set_clip(area.clip(clip))
+        for chunk_x in range(first_x, last_x + 1):
+            for chunk_y in range(first_y, last_y + 1):
+                surface.blit(self._get_chunk(chunk_x, chunk_y), (origin.x + chunk_x * span, origin.y + chunk_y * span))
+        surface.set_clip(clip)
+
+        in_view = (last_x - first_x + 1) * (last_y - first_y + 1)
+        while len(self.chunks) > max(self.cache_size, in_view):
+            self.chunks.popitem(last=False)
+
+    def _get_chunk(self, chunk_x: int, chunk_y: int) -> Surface:
+        """ Get the surface of a chunk, rendering it if it isn't cached.
+
+        :param chunk_x: The x coordinate of the chunk, in chunks.
+        :param chunk_y: The y coordinate of the chunk, in chunks.
+        :return: The rendered chunk.
+        """
+        size = TileMap.ChunkSize
+        if not self.bounds.colliderect(Rect(chunk_x * size, chunk_y * size, size, size)):
+            if self.background_chunk is None:
+                self.background_chunk = Surface((size * self.tile_size, size * self.tile_size)).convert()
+                for x in range(size):
+                    for y in range(size):
+                        self.background.render(self.background_chunk, Position(x * self.tile_size, y * self.tile_size))
+            return self.background_chunk
+
+        key = (chunk_x, chunk_y)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        chunk = Surface((size * self.tile_size, size * self.tile_size)).convert()
+        for x in range(size):
+            for y in range(size):
+                tile_x = chunk_x * size + x
+                tile_y = chunk_y * size + y
+                if self.bounds.collidepoint(tile_x, tile_y):
+                    texture, direction = self.tile(tile_x, tile_y)
+                    texture.render(chunk, Position(x * self.tile_size, y * self.tile_size), direction)
+                else:
+                    self.background.render(chunk, Position(x * self.tile_size, y * self.tile_size))
+
+        self.chunks[key] = chunk
+        return chunk
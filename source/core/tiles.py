@@ -0,0 +1,84 @@
+""" The kinds of tiles maps are made of.
+
+Classes:
+    - Tile
+    - TileGrid
+"""
+
+from enum import Enum
+from source.core.tools import Position, Direction
+
+
+class Tile(Enum):
+    """
+    The kind of a tile of a map.
+    """
+    BRICK = 0
+    FLOOR = 1
+    ROOM = 2
+    STAIRS = 3
+    DOOR = 4
+
+
+class TileGrid:
+    """
+    The kind and orientation of every tile of a map, stored as a 2D array covering the bounds of the map. Every tile
+    outside of the bounds is brick.
+    """
+    def __init__(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        :param x: The x coordinate of the top-left corner of the bounds.
+        :param y: The y coordinate of the top-left corner of the bounds.
+        :param width: The width of the bounds.
+        :param height: The height of the bounds.
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+        self.kinds = bytearray(width * height)
+        self.directions = bytearray(width * height)
+
+    def __getitem__(self, position: Position) -> Tile:
+        index = self._index(position.x, position.y)
+        if index == -1:
+            return Tile.BRICK
+        return Tile(self.kinds[index])
+
+    def set(self, position: Position, kind: Tile, direction: Direction = Direction.NORTH) -> None:
+        """ Changes the tile at a position.
+
+        :param position: The position of the tile, which must be inside of the bounds.
+        :param kind: The kind of the tile.
+        :param direction: The orientation of the tile.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1:
+            raise IndexError(position)
+        self.kinds[index] = kind.value
+        self.directions[index] = direction.value
+
+    def get_direction(self, position: Position) -> Direction:
+        """ Get the orientation of the tile at a position.
+
+        :param position: The position of the tile.
+        :return: The orientation of the tile, north for the tiles outside of the bounds.
+        """
+        index = self._index(position.x, position.y)
+        if index == -1:
+            return Direction.NORTH
+        return Direction(self.directions[index])
+
+    def _index(self, x: int, y: int) -> int:
+        """ Get the index of the tile at a position.
+
+        :param x: The x coordinate of the position.
+        :param y: The y coordinate of the position.
+        :return: The index of the tile, or -1 if the position is out of bounds.
+        """
+        x -= self.x
+        y -= self.y
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
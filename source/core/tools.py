@@ -3,11 +3,14 @@
 Classes:
     - Direction
     - Position
+Functions:
+    - derive_rng
 """
 
 from __future__ import annotations
 from enum import Enum
 from math import sqrt
+from random import Random
 
 
 class Direction(Enum):
@@ -110,3 +113,15 @@ class Position:
         :return: The distance between this position and the other.
         """
         return int(round(sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)))
+
+
+def derive_rng(seed: str, *keys: object) -> Random:
+    """ Creates a random number generator of its own for a part of the game, derived from the game's seed.
+
+    :param seed: The seed of the game.
+    :param keys: The values identifying the part of the game, such as a difficulty and a position.
+    :return: A random number generator which is always seeded the same way for the same seed and keys.
+    """
+    rng = Random()
+    rng.seed(a=":".join([seed] + [str(key) for key in keys]), version=2)
+    return rng
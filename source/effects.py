@@ -69,6 +69,7 @@ class SpeedEffect(Effect):
     def update(self, events: list[event.Event]) -> None:
         if not self.done:
             self.target.speed += 1
+            self.target.notify()
             self.done = True
 
     def should_fade(self) -> bool:
@@ -11,7 +11,9 @@ from source.traits.fighter import Fighter
 from source.traits.mobile import Mobile
 from source.traits.effect import Affectible
 from source.core.tools import Position, Direction
+from source.core.graph import GridGraph
 from source.core.component import Component
+from source.core.pathfinding import DistanceField
 from source.resources import TEXTURES as T
 
 
@@ -19,7 +21,7 @@ class Enemy(Fighter, Mobile, Affectible):
     """
     An enemy found in the dungeon.
     """
-    def __init__(self, max_health: int, speed: int, position: Position, direction: Direction, graph: dict[Position, list[Position]], rng: Random) -> None:
+    def __init__(self, max_health: int, speed: int, position: Position, direction: Direction, graph: GridGraph, rng: Random) -> None:
         """
         :param max_health: The maximum amount of health the enemy can have.
         :param speed: The attack speed of the enemy.
@@ -54,6 +56,7 @@ class RoamingEnemyComponent(Component):
         self.last_break_update = time()
         self.break_start = 0
         self.has_target = False
+        self.field: DistanceField = None
         self.ai_locked = False
 
     def update(self, events: list[event.Event]) -> None:
@@ -66,7 +69,10 @@ class RoamingEnemyComponent(Component):
 
         if self.has_target:
             if time() - self.last_moved >= 0.25:
-                self.enemy.move_towards(self.destination)
+                if self.field is not None:
+                    self.enemy.follow(self.field)
+                else:
+                    self.enemy.move_towards(self.destination)
                 self.last_moved = time()
         elif self.taking_break:
             if time() - self.last_break_update >= 0.50:
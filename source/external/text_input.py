@@ -29,7 +29,8 @@ class TextInput:
             repeat_keys_initial_ms=400,
             repeat_keys_interval_ms=35,
             max_string_length=-1,
-            password=False):
+            password=False,
+            font_object=None):
         """
         :param initial_string: Initial text to be displayed
         :param font_family: name or list of names for font (see pygame.font.match_font for precise format)
@@ -40,6 +41,7 @@ class TextInput:
         :param repeat_keys_initial_ms: Time in ms before keys are repeated when held
         :param repeat_keys_interval_ms: Interval between key press repetition when held
         :param max_string_length: Allowed length of text
+        :param font_object: Already loaded font to use instead of loading font_family
         """
 
         # Text related vars:
@@ -50,10 +52,13 @@ class TextInput:
         self.password = password
         self.input_string = initial_string  # Inputted text
 
-        if not os.path.isfile(font_family):
-            font_family = pygame.font.match_font(font_family)
+        if font_object is not None:
+            self.font_object = font_object
+        else:
+            if not os.path.isfile(font_family):
+                font_family = pygame.font.match_font(font_family)
 
-        self.font_object = pygame.font.Font(font_family, font_size)
+            self.font_object = pygame.font.Font(font_family, font_size)
 
         # Text-surface will be created during the first update call:
         self.surface = pygame.Surface((1, 1))
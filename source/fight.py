@@ -28,6 +28,7 @@ class FightLayer(Layer):
         """
         super().__init__(False, width, height)
         self.start_time = time()
+        self.started = False
         self.end_time = -1
         self.ended = False
 
@@ -49,7 +50,7 @@ class FightLayer(Layer):
             self.player_display.render_position.x - 160,
             self.player_display.render_position.y + int(self.player_display.render_height * 1.5)
         ), self.player_display.render_width + 320, 256)
-        self.player_text.set_text([
+        self.player_text.bind([player, player.inventory], lambda: [
             "PLAYER",
             f"Health: {player.health}/{player.max_health}",
             f"Speed: {player.speed - player.inventory.get_equipped_weight()}"
@@ -69,7 +70,7 @@ class FightLayer(Layer):
             self.enemy_display.render_position.x - 160,
             self.enemy_display.render_position.y + int(self.enemy_display.render_height * 1.5)
         ), self.enemy_display.render_width + 320, 256, True, 12.0)
-        self.enemy_text.set_text([
+        self.enemy_text.bind([enemy, enemy.inventory], lambda: [
             "ENEMY",
             f"Health: {enemy.health}/{enemy.max_health}",
             f"Speed: {enemy.speed - enemy.inventory.get_equipped_weight()}"
@@ -92,8 +93,17 @@ class FightLayer(Layer):
         super().update(events)
 
         if time() - self.start_time >= 3.0 and self.end_time == -1:
-            self.player_display.can_attack = True
-            self.enemy_display.can_attack = True
+            if not self.started:
+                self.started = True
+                self.player_display.can_attack = True
+                self.enemy_display.can_attack = True
+
+                self.title_text.animated = False
+                self.title_text.set_text(["Fight!"])
+
+                # The stats are shown at once, whether they were done appearing or not.
+                self.enemy_text.animated = False
+                self.enemy_text.pre_render()
 
             if time() - self.player_display.player.last_attack <= 0.35:
                 self.player_display.render_position = Position(
@@ -117,22 +127,6 @@ class FightLayer(Layer):
                     (self.height - self.enemy_display.render_height) // 2
                 )
 
-            self.title_text.animated = False
-            self.title_text.set_text(["Fight!"])
-
-            self.player_text.set_text([
-                "PLAYER",
-                f"Health: {self.player_display.player.health}/{self.player_display.player.max_health}",
-                f"Speed: {self.player_display.player.speed - self.player_display.player.inventory.get_equipped_weight()}"
-            ])
-
-            self.enemy_text.animated = False
-            self.enemy_text.set_text([
-                "ENEMY",
-                f"Health: {self.enemy_display.enemy.health}/{self.enemy_display.enemy.max_health}",
-                f"Speed: {self.enemy_display.enemy.speed - self.enemy_display.enemy.inventory.get_equipped_weight()}"
-            ])
-
         if self.end_time == -1:
             if self.player_display.player.health == 0:
                 self.lock_component("player_display")
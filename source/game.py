@@ -6,15 +6,18 @@ Classes:
 from random import Random, choice
 from time import time
 from os import listdir
+from concurrent.futures import ThreadPoolExecutor, Future
 import pygame as pg
 from source.core.layer import LayerManager, Layer
 from source.player import Player
 from source.level import Level, LevelLayer
 from source.core.tools import Position, Direction
-from source.room import Room, RoomLayer
+from source.core.graph import GridGraph
+from source.core.tiles import Tile
+from source.room import Room, RoomLayer, generate_room
 from source.menu import MenuLayer
 from source.core.texture import Texture
-from source.resources import TEXTURES
+from source.resources import TEXTURES, FONTS
 from source.inventory import InventoryLayer
 from source.loot import ITEMS, LootTable
 from source.enemy import RoamingEnemyComponent, Enemy
@@ -29,7 +32,15 @@ class Game(LayerManager):
     """
     Manages the game's flow and states.
     """
-    def __init__(self) -> None:
+    def __init__(self, prefetch: bool = True, fps: int = 60, tick_rate: int = 60, max_skipped_frames: int = 5, idle_fps: int = 10) -> None:
+        """
+        :param prefetch: If the next level should be generated in the background while the current one is explored.
+        :param fps: The maximum amount of frames rendered per second.
+        :param tick_rate: The amount of times the game is updated per second, whatever the frame rate.
+        :param max_skipped_frames: The maximum amount of updates done in a row without rendering when rendering falls
+        behind. If 0, the game is rendered after every update and slows down instead.
+        :param idle_fps: The amount of frames per second while the window isn't focused.
+        """
         super().__init__()
 
         pg.init()
@@ -39,7 +50,9 @@ class Game(LayerManager):
 
         Texture.UIScale = self.window.get_width() / 1920
         Texture.TileSize = self.window.get_width() // 40
-        TEXTURES.load("resources/textures.json")
+        Texture.CachePath = ".cache/textures"
+        TEXTURES.load("resources/textures.json", True, 4)
+        FONTS.load("resources/fonts.json")
 
         self.generation_rng: Random = None
         self.ai_rng: Random = None
@@ -55,6 +68,14 @@ class Game(LayerManager):
         self.end_layer: EndLayer = None
         self.pause_layer: PauseLayer = None
 
+        self.prefetch = prefetch
+        self.fps = fps
+        self.tick_rate = tick_rate
+        self.max_skipped_frames = max_skipped_frames
+        self.idle_fps = idle_fps
+        self.loader = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        self.next_level: Future = None
+
         self.menu_layer = MenuLayer(self.window.get_width(), self.window.get_height())
         self.transition_layer = Layer(True, self.window.get_width(), self.window.get_height())
 
@@ -65,26 +86,110 @@ class Game(LayerManager):
         self.run = False
 
     def start(self) -> None:
-        """
-        Starts the game's loop.
+        """ Starts the game's loop.
+
+        The game is updated at a fixed rate, and rendered after the updates, at most at the target frame rate. When
+        rendering falls behind, a few updates are done in a row before rendering, and the time which can't be caught
+        up is dropped. While the window isn't focused, the loop only runs a few times per second.
         """
         self.run = True
+        clock = pg.time.Clock()
+        step = 1 / self.tick_rate
+        lag = 0.0
+        events: list[pg.event.Event] = []
         while self.run:
-            events = pg.event.get()
-            for event in events:
+            focused = pg.key.get_focused()
+            lag += clock.tick(self.fps if focused else self.idle_fps) / 1000
+
+            for event in pg.event.get():
                 if event.type == pg.QUIT:
                     self.run = False
+                elif event.type == pg.VIDEOEXPOSE or event.type == pg.WINDOWEXPOSED:
+                    self.invalidate()
+                events.append(event)
+
+            # The events are given to the first update only, and kept until there is one.
+            updates = 0
+            max_updates = self.max_skipped_frames + 1 if focused else 1
+            while self.run and lag >= step and updates < max_updates:
+                self.update(events)
+                events = []
+                lag -= step
+                updates += 1
+            if lag >= step:
+                lag = 0.0
+
+            if updates > 0:
+                Texture.tick()
+                rects = self.render(self.window)
+                if rects:
+                    pg.display.update(rects)
+
+        if self.loader is not None:
+            self.loader.shutdown(wait=False, cancel_futures=True)
+        pg.quit()
 
-            self.update(events)
-            self.render(self.window)
-            pg.display.update()
+    @staticmethod
+    def _generate_level(difficulty: int, rng: Random) -> Level:
+        """ Generates a level. Its rooms are only generated once they are entered.
 
-        pg.quit()
+        :param difficulty: The difficulty of the level.
+        :param rng: The generation rng of the game the level belongs to.
+        :return: The generated level.
+        """
+        return Level(difficulty, rng)
+
+    def _get_room(self, position: Position) -> Room:
+        """ Get a room of the current level, generating it the first time it is needed.
+
+        :param position: The position of the room inside of the level.
+        :return: The room at the given position.
+        """
+        if position not in self.rooms:
+            loot_table_index = self.level.difficulty - 1 if self.level.difficulty - 1 < len(self.loot_tables) else -1
+            self.rooms[position] = generate_room(self.seed, self.level, position, self.loot_tables[loot_table_index], self.ai_rng)
+        return self.rooms[position]
+
+    def _prefetch_level(self, difficulty: int) -> None:
+        """ Starts generating a level in the background, if prefetching is enabled.
+
+        The generation rng is only ever drawn from to generate levels, one after the other. While a level is being
+        prefetched, the loader is the only one to draw from it, so that the levels are the same as if they were
+        generated when needed.
+
+        :param difficulty: The difficulty of the level.
+        """
+        self._cancel_prefetch()
+        if self.prefetch:
+            self.next_level = self.loader.submit(Game._generate_level, difficulty, self.generation_rng)
+
+    def _cancel_prefetch(self) -> None:
+        """
+        Drops the level being prefetched, if any. A level which is already being generated can't be stopped, so it is
+        left to finish on a loader of its own, and the next levels are prefetched on a new loader instead of waiting
+        behind it.
+        """
+        if self.next_level is not None and not self.next_level.cancel() and not self.next_level.done():
+            self.loader.shutdown(wait=False)
+            self.loader = ThreadPoolExecutor(max_workers=1)
+        self.next_level = None
+
+    def _take_level(self, difficulty: int) -> Level:
+        """ Get a level, waiting for it to be prefetched or generating it right away.
+
+        :param difficulty: The difficulty of the level.
+        :return: The level.
+        """
+        if self.next_level is not None:
+            future, self.next_level = self.next_level, None
+            return future.result()
+        return Game._generate_level(difficulty, self.generation_rng)
 
     def _initial_load(self) -> None:
         """
         Loads the game's component after the menu phase.
         """
+        self._cancel_prefetch()
         self.generation_rng = Random()
         self.ai_rng = Random()
         if self.menu_layer.input.get_text() == "":
@@ -99,14 +204,15 @@ class Game(LayerManager):
         ITEMS.load("data/items.json")
         self.loot_tables = [LootTable(f"data/loot_tables/{file}", self.generation_rng) for file in sorted(listdir("data/loot_tables/")) if file.split(".")[-1] == "json"]
 
-        self.level = Level(1, self.generation_rng)
+        self.level = Game._generate_level(1, self.generation_rng)
+        self.rooms = {}
+        self._prefetch_level(2)
         self.player = Player(15, 5, list(self.level.graph.keys())[0], Direction.NORTH, self.level.graph)
         self.level_layer = LevelLayer(self.level, self.player, self.window.get_width(), self.window.get_height())
-        self.rooms = {self.level.rooms[i]: Room(1, self.generation_rng, self.ai_rng, self.loot_tables[0], [p.direction_of(self.level.rooms[i]) for p in self.level.graph[self.level.rooms[i]]]) for i in range(len(self.level.rooms))}
-        self.current_room = list(self.rooms.keys())[0]
-        self.room_layer = RoomLayer(list(self.rooms.values())[0], self.player, self.window.get_width(), self.window.get_height())
+        self.current_room = self.level.rooms[0]
+        self.room_layer = RoomLayer(self._get_room(self.current_room), self.player, self.window.get_width(), self.window.get_height())
         self.inventory_layer = InventoryLayer(self.player, self.player.inventory, self.window.get_width(), self.window.get_height())
-        self.fight_layer = FightLayer(self.player, Enemy(1, 1, Position(0, 0), Direction.NORTH, {"a": 0}, Random()), self.window.get_width(), self.window.get_height())
+        self.fight_layer = FightLayer(self.player, Enemy(1, 1, Position(0, 0), Direction.NORTH, GridGraph(), Random()), self.window.get_width(), self.window.get_height())
         self.end_layer = EndLayer(self.player, 0, self.window.get_width(), self.window.get_height())
         self.pause_layer = PauseLayer(self.window.get_width(), self.window.get_height())
 
@@ -130,20 +236,17 @@ class Game(LayerManager):
         """
         Loads the next level's components.
         """
-        self.level = Level(self.level.difficulty + 1, self.generation_rng)
+        self.level = self._take_level(self.level.difficulty + 1)
+        self.rooms = {}
+        self._prefetch_level(self.level.difficulty + 1)
 
         self.player.position = list(self.level.graph.keys())[0]
         self.player.graph = self.level.graph
         self.level_layer.player_display.last_moved = time() + 0.2
 
-        loot_table_index = self.level.difficulty - 1 if self.level.difficulty - 1 < len(self.loot_tables) else -1
-        self.rooms = {self.level.rooms[i]: Room(self.level.difficulty, self.generation_rng, self.ai_rng, self.loot_tables[loot_table_index], [p.direction_of(self.level.rooms[i]) for p in self.level.graph[self.level.rooms[i]]]) for i in range(len(self.level.rooms))}
-        self.current_room = list(self.rooms.keys())[0]
 
         self.level_layer.level_display.level = self.level
         self.level_layer.level_display.center = self.player.position
-        self.room_layer.room_display.room = self.rooms[self.current_room]
-        self.room_layer.enemy_displays = [RoamingEnemyComponent(enemy, Position(0, 0)) for enemy in self.rooms[self.current_room].enemies]
 
         self.level_layer.info_text.set_text([
             f"Level: {self.level.difficulty}",
@@ -157,10 +260,10 @@ class Game(LayerManager):
         """
         Sets up a room in order to display it.
 
-        :param room: The index of the room inside of `self.rooms`
+        :param room: The position of the room inside of the level.
         """
         self.current_room = room
-        self.room_layer.room_display.room = self.rooms[self.current_room]
+        self.room_layer.room_display.room = self._get_room(self.current_room)
         self.room_layer.enemy_displays = [RoamingEnemyComponent(enemy, Position(0, 0)) for enemy in self.rooms[self.current_room].enemies]
 
         direction_to_pos_doors = {self.rooms[self.current_room].doors[p]: p for p in self.rooms[self.current_room].doors}
@@ -171,7 +274,7 @@ class Game(LayerManager):
 
         self.room_layer.info_text.set_text([
             f"Level: {self.level.difficulty}",
-            f"Room: {list(self.rooms.keys()).index(self.current_room) + 1}",
+            f"Room: {self.level.rooms.index(self.current_room) + 1}",
             f"Seed: {self.seed}"
         ])
 
@@ -247,6 +350,7 @@ class Game(LayerManager):
 
         :param events: A list of the lastly pulled events.
         """
+        TEXTURES.poll()
         super().update(events)
 
         if self.get_focus() == "menu":
@@ -255,12 +359,13 @@ class Game(LayerManager):
                 self.menu_layer.button.is_clicked = False
                 self.menu_layer.input.clear_text()
         elif self.get_focus() == "level":
-            if self.player.position in self.level.stairs:
+            tile = self.level.tiles[self.player.position]
+            if tile == Tile.STAIRS:
                 self._level_down()
-            elif self.player.position in self.level.rooms:
+            elif tile == Tile.ROOM:
                 self._enter_room(self.player.position)
         elif self.get_focus() == "room":
-            if self.player.position in self.rooms[self.current_room].doors:
+            if self.rooms[self.current_room].tiles[self.player.position] == Tile.DOOR:
                 self._exit_room()
             else:
                 enemy_id = -1
@@ -5,6 +5,7 @@ Classes:
     - InventoryLayer
 """
 
+from math import ceil, floor
 from pygame import Surface, event, draw, Rect, MOUSEBUTTONDOWN, mouse, MOUSEMOTION
 from source.item import Item, Weapon, Armor, ArmorSlot, ItemComponent, Consumable
 from source.core.component import Component
@@ -15,17 +16,28 @@ from source.ui.darkener import DarkenerComponent
 from source.core.texture import Texture
 from source.ui.box import BoxComponent
 from source.ui.text import TextComponent
+from source.traits.observable import Observable
 
 
-class Inventory:
+class Inventory(Observable):
     """
-    Represents the inventory of an entity. Contains items, weapons, armor...
+    Represents the inventory of an entity. Contains items, weapons, armor... Its observers are notified when its content
+    changes, and its version is incremented.
     """
     def __init__(self) -> None:
+        Observable.__init__(self)
+        self.version = 0
         self.misc: list[Item] = [None for _ in range(8)]
         self.weapon: Weapon = None
         self.armor: dict[ArmorSlot, Armor] = {slot: None for slot in ArmorSlot}
 
+    def notify(self) -> None:
+        """
+        Increments the version of the inventory, and tells every observer that its content has changed.
+        """
+        self.version += 1
+        super().notify()
+
     def add_item(self, item: Item) -> int:
         """ Adds an item to the inventory.
 
@@ -35,6 +47,7 @@ class Inventory:
         if self.misc.count(None) > 0:
             index = self.misc.index(None)
             self.misc[index] = item
+            self.notify()
             return index
         return -1
 
@@ -52,6 +65,7 @@ class Inventory:
         :param index: The index of the slot in which the item is placed.
         """
         self.misc[index] = None
+        self.notify()
 
     def set_weapon(self, weapon: Weapon, store_current: bool = True) -> bool:
         """ Changes the currently equipped weapon.
@@ -63,6 +77,7 @@ class Inventory:
         if store_current and self.weapon is not None and self.add_item(self.weapon) == -1:
             return False
         self.weapon = weapon
+        self.notify()
         return True
 
     def get_weapon(self) -> Weapon:
@@ -80,6 +95,7 @@ class Inventory:
         index = self.add_item(self.weapon)
         if index != -1:
             self.weapon = None
+            self.notify()
         return index
 
     def set_armor(self, armor: Armor, store_current: bool = True) -> bool:
@@ -92,6 +108,7 @@ class Inventory:
         if store_current and self.armor[armor.slot] is not None and self.add_item(self.armor[armor.slot]) == -1:
             return False
         self.armor[armor.slot] = armor
+        self.notify()
         return True
 
     def get_armor(self, slot: ArmorSlot) -> Armor:
@@ -111,6 +128,7 @@ class Inventory:
         index = self.add_item(self.armor[armor_slot])
         if index != -1:
             self.armor[armor_slot] = None
+            self.notify()
         return index
 
     def get_protection(self) -> int:
@@ -142,7 +160,9 @@ class Inventory:
 
 class InventoryComponent(Component):
     """
-    Used to display an inventory.
+    Used to display an inventory. The component of each slot is kept, and only replaced when the content of the slot
+    changes, which is only checked when the version of the inventory changes. The areas in which the slots can be
+    clicked are computed once, in the order of the slots (misc, armor, then weapon), to find the slot under the mouse.
     """
     def __init__(self, inventory: Inventory, entity, render_position: Position) -> None:
         """
@@ -158,85 +178,156 @@ class InventoryComponent(Component):
         self.inventory = inventory
         self.entity = entity
 
-        self.misc_components = [ItemComponent(Item("empty", 0), Position(0, 0)) for i in range(len(self.inventory.misc))]
-        self.armor_components = [ItemComponent(Item("empty", 0), Position(0, 0)) for i in range(len(ArmorSlot))]
-        self.weapon_component = ItemComponent(Item("empty", 0), Position(0, 0))
+        self.empty_item = Item("empty", 0)
+        self.empty_armors = {slot: Armor("empty_armor", 0, 0, slot) for slot in ArmorSlot}
+        self.empty_weapon = Weapon("empty_weapon", 0, 0)
 
-    def update(self, events: list[event.Event]) -> None:
-        """ Updates the inventory and manage the mouse interaction.
+        self.misc_components = [ItemComponent(self.empty_item, Position(0, 0)) for _ in range(len(self.inventory.misc))]
+        self.armor_components = [ItemComponent(self.empty_armors[slot], Position(0, 0)) for slot in ArmorSlot]
+        self.weapon_component = ItemComponent(self.empty_weapon, Position(0, 0))
+        self.version = -1
+        self.layout_position: Position = None
+        self.slots_rect = Rect(0, 0, 0, 0)
+        self.slot_rects: list[Rect] = []
+        self.synchronize()
 
-        :param events: A list of the lastly pulled events.
+    def get_rect(self) -> Rect:
+        """ Get the area of the surface covered by the inventory and its items.
+
+        :return: The area covered by the inventory and each of its items.
         """
-        self.misc_components = [
-            ItemComponent(
-                self.inventory.misc[i] if self.inventory.misc[i] is not None else Item("empty", 0),
-                Position(
-                    self.render_position.x + (64 + 96) * Texture.UIScale * (i % 4) + 32 * Texture.UIScale,
-                    self.render_position.y + (64 + 96) * Texture.UIScale * (i // 4) + 32 * Texture.UIScale
-                )
-            )
-            for i in range(len(self.inventory.misc))
-        ]
-
-        self.armor_components = [
-            ItemComponent(
-                self.inventory.armor[ArmorSlot(i)] if self.inventory.armor[ArmorSlot(i)] is not None else Armor("empty_armor", 0, 0, ArmorSlot(i)),
-                Position(
-                    self.render_position.x + self.misc_texture.get_width() + (32 * Texture.UIScale),
-                    self.render_position.y + (8 + 96) * Texture.UIScale * i + 8 * Texture.UIScale
-                )
+        self.synchronize()
+        return super().get_rect().union(self.slots_rect)
+
+    def get_state(self) -> object:
+        """ Get a description of how the inventory looks.
+
+        :return: The version of the inventory shown.
+        """
+        return self.version
+
+    def layout(self) -> None:
+        """
+        Places the component of every slot, relatively to the position of the inventory.
+        """
+        self.layout_position = self.render_position
+        for i in range(len(self.misc_components)):
+            self.misc_components[i].render_position = Position(
+                self.render_position.x + (64 + 96) * Texture.UIScale * (i % 4) + 32 * Texture.UIScale,
+                self.render_position.y + (64 + 96) * Texture.UIScale * (i // 4) + 32 * Texture.UIScale
             )
-            for i in range(len(ArmorSlot))
-        ]
-
-        self.weapon_component = ItemComponent(
-            self.inventory.weapon if self.inventory.weapon is not None else Weapon("empty_weapon", 0, 0),
-            Position(
-                self.render_position.x + self.misc_texture.get_width() + 192 * Texture.UIScale,
-                self.render_position.y + 112 * Texture.UIScale
+        for i in range(len(self.armor_components)):
+            self.armor_components[i].render_position = Position(
+                self.render_position.x + self.misc_texture.get_width() + (32 * Texture.UIScale),
+                self.render_position.y + (8 + 96) * Texture.UIScale * i + 8 * Texture.UIScale
             )
+        self.weapon_component.render_position = Position(
+            self.render_position.x + self.misc_texture.get_width() + 192 * Texture.UIScale,
+            self.render_position.y + 112 * Texture.UIScale
         )
+        self.slots_rect = self.misc_components[0].get_rect().unionall([item.get_rect() for item in self.misc_components + self.armor_components + [self.weapon_component]])
+
+        # A slot covers the pixels from its position to 96 scaled pixels further, both included.
+        self.slot_rects = []
+        for item in self.misc_components + self.armor_components + [self.weapon_component]:
+            left, top = ceil(item.render_position.x), ceil(item.render_position.y)
+            right, bottom = floor(item.render_position.x + 96 * Texture.UIScale), floor(item.render_position.y + 96 * Texture.UIScale)
+            self.slot_rects.append(Rect(left, top, right - left + 1, bottom - top + 1))
+
+    def get_slot(self, position: Position) -> tuple[str, int]:
+        """ Get the slot at a position.
+
+        :param position: The position, usually the one of the mouse.
+        :return: The kind of the slot ("misc", "armor" or "weapon") and its index, or None if there is no slot there.
+        """
+        self.synchronize()
+        index = Rect(position.x, position.y, 1, 1).collidelist(self.slot_rects)
+        if index == -1:
+            return None
+        if index < len(self.misc_components):
+            return "misc", index
+        index -= len(self.misc_components)
+        if index < len(self.armor_components):
+            return "armor", index
+        return "weapon", 0
+
+    def get_slot_component(self, slot: tuple[str, int]) -> ItemComponent:
+        """ Get the component showing the content of a slot.
+
+        :param slot: The kind of the slot and its index.
+        :return: The component of the slot.
+        """
+        if slot[0] == "misc":
+            return self.misc_components[slot[1]]
+        if slot[0] == "armor":
+            return self.armor_components[slot[1]]
+        return self.weapon_component
+
+    def synchronize(self) -> None:
+        """
+        Replaces the components of the slots whose content changed since the last synchronization.
+        """
+        if self.layout_position is None or self.layout_position != self.render_position:
+            self.layout()
+        if self.version == self.inventory.version:
+            return
+        self.version = self.inventory.version
+
+        for i in range(len(self.misc_components)):
+            item = self.inventory.misc[i] if self.inventory.misc[i] is not None else self.empty_item
+            if self.misc_components[i].item is not item:
+                self.misc_components[i] = ItemComponent(item, self.misc_components[i].render_position)
+
+        for i in range(len(self.armor_components)):
+            item = self.inventory.armor[ArmorSlot(i)] if self.inventory.armor[ArmorSlot(i)] is not None else self.empty_armors[ArmorSlot(i)]
+            if self.armor_components[i].item is not item:
+                self.armor_components[i] = ItemComponent(item, self.armor_components[i].render_position)
+
+        item = self.inventory.weapon if self.inventory.weapon is not None else self.empty_weapon
+        if self.weapon_component.item is not item:
+            self.weapon_component = ItemComponent(item, self.weapon_component.render_position)
+
+    def update(self, events: list[event.Event]) -> None:
+        """ Updates the inventory and manage the mouse interaction.
+
+        :param events: A list of the lastly pulled events.
+        """
+        self.synchronize()
 
         for e in events:
             if e.type == MOUSEBUTTONDOWN:
-                position = Position(mouse.get_pos()[0], mouse.get_pos()[1])
+                slot = self.get_slot(Position(mouse.get_pos()[0], mouse.get_pos()[1]))
+                if slot is None:
+                    continue
+                item = self.get_slot_component(slot).item
 
                 if e.button == 1:  # left click
-                    for i in range(len(self.misc_components)):
-                        if self.misc_components[i].render_position.x <= position.x <= self.misc_components[i].render_position.x + 96 * Texture.UIScale and \
-                           self.misc_components[i].render_position.y <= position.y <= self.misc_components[i].render_position.y + 96 * Texture.UIScale:
-                            if isinstance(self.misc_components[i].item, Armor):
-                                self.inventory.set_armor(self.misc_components[i].item, True)
-                                self.inventory.remove_item(i)
-                            elif isinstance(self.misc_components[i].item, Weapon):
-                                self.inventory.set_weapon(self.misc_components[i].item, True)
-                                self.inventory.remove_item(i)
-                            elif isinstance(self.misc_components[i].item, Consumable):
-                                self.misc_components[i].item.use(self.entity)
-                                self.inventory.remove_item(i)
-                            break
-
-                    for item in self.armor_components:
-                        if item.render_position.x <= position.x <= item.render_position.x + 96 * Texture.UIScale and \
-                           item.render_position.y <= position.y <= item.render_position.y + 96 * Texture.UIScale:
-                            self.inventory.store_armor(item.item.slot)
-                            break
-
-                    if self.weapon_component.render_position.x <= position.x <= self.weapon_component.render_position.x + 96 * Texture.UIScale and \
-                       self.weapon_component.render_position.y <= position.y <= self.weapon_component.render_position.y + 96 * Texture.UIScale:
+                    if slot[0] == "misc":
+                        if isinstance(item, Armor):
+                            self.inventory.set_armor(item, True)
+                            self.inventory.remove_item(slot[1])
+                        elif isinstance(item, Weapon):
+                            self.inventory.set_weapon(item, True)
+                            self.inventory.remove_item(slot[1])
+                        elif isinstance(item, Consumable):
+                            item.use(self.entity)
+                            self.inventory.remove_item(slot[1])
+                    elif slot[0] == "armor":
+                        self.inventory.store_armor(item.slot)
+                    else:
                         self.inventory.store_weapon()
 
-                elif e.button == 3:  # right click
-                    for i in range(len(self.misc_components)):
-                        if self.misc_components[i].render_position.x <= position.x <= self.misc_components[i].render_position.x + 96 * Texture.UIScale and \
-                           self.misc_components[i].render_position.y <= position.y <= self.misc_components[i].render_position.y + 96 * Texture.UIScale:
-                            self.inventory.remove_item(i)
+                elif e.button == 3 and slot[0] == "misc":  # right click
+                    self.inventory.remove_item(slot[1])
+
+        self.synchronize()
 
     def render(self, surface: Surface) -> None:
         """ Renders the inventory to the screen.
 
         :param surface: The surface on which the inventory will be rendered.
         """
+        self.synchronize()
 
         self.misc_texture.render(surface, self.render_position)
         self.equipped_texture.render(surface, Position(self.render_position.x + self.misc_texture.get_width(), self.render_position.y))
@@ -264,6 +355,11 @@ class InventoryLayer(Layer):
         self.inventory_display = InventoryComponent(inventory, self.player, Position(0, 0))
         self.inventory_display.render_position = Position((width - self.inventory_display.render_width) // 2, (height - self.inventory_display.render_height) // 2)
         self.stats_text = TextComponent("resources/font.ttf", 24, (255, 255, 255), Position(self.inventory_display.render_position.x, self.inventory_display.render_position.y - 112), self.inventory_display.render_width, 96)
+        self.stats_text.bind([self.player, self.player.inventory], lambda: [
+            f"Health: {self.player.health}/{self.player.max_health}",
+            f"Exp: level {self.player.exp_level} ({self.player.exp_amount}/{self.player.exp_needed} to level {self.player.exp_level + 1})",
+            f"Attack speed: {self.player.speed - self.player.inventory.get_equipped_weight()} ({self.player.speed} - {self.player.inventory.get_equipped_weight()})"
+        ])
         self.darkener = DarkenerComponent(Position(0, 0), self.width, self.height)
         self.hint_box = BoxComponent(Position(0, 0), 384, 256)
         self.hint_text = TextComponent("resources/font.ttf", 24, (0, 0, 0), Position(0, 0), 384, 256)
@@ -275,6 +371,8 @@ class InventoryLayer(Layer):
         self.add_component("hint_text", self.hint_text)
         self.lock_component("hint_box")
         self.lock_component("hint_text")
+        self.hovered: tuple[tuple[str, int], Item] = None
+        self.hint_version = -1
 
     def update(self, events: list[event.Event]) -> None:
         """ Updates the inventory layer.
@@ -283,89 +381,53 @@ class InventoryLayer(Layer):
         """
         super().update(events)
 
-        self.stats_text.set_text([
-            f"Health: {self.player.health}/{self.player.max_health}",
-            f"Exp: level {self.player.exp_level} ({self.player.exp_amount}/{self.player.exp_needed} to level {self.player.exp_level + 1})",
-            f"Attack speed: {self.player.speed - self.player.inventory.get_equipped_weight()} ({self.player.speed} - {self.player.inventory.get_equipped_weight()})"
-        ])
-
-        for e in events:
-            if e.type == MOUSEMOTION:
-                mouse_position = Position(mouse.get_pos()[0], mouse.get_pos()[1])
-
-                hovered = False
-                for item in self.inventory_display.misc_components:
-                    if item.render_position.x <= mouse_position.x <= item.render_position.x + 96 * Texture.UIScale and \
-                       item.render_position.y <= mouse_position.y <= item.render_position.y + 96 * Texture.UIScale:
-                        lines = [item.item.name, "", f"Weight: {item.item.weight}"]
-                        if isinstance(item.item, Weapon):
-                            lines.append(f"Damage: {item.item.damage}")
-                        elif isinstance(item.item, Armor):
-                            lines.append(f"Protection: {item.item.protection}")
-                        elif isinstance(item.item, Consumable):
-                            lines.append(f"Effects: {', '.join(item.item.effect_names)}")
-                        self.hint_text.set_text(lines)
-
-                        self.hint_box.render_position = mouse_position
-                        self.hint_text.render_position = mouse_position
-
-                        if self.is_locked("hint_box"):
-                            self.unlock_component("hint_box")
-                        if self.is_locked("hint_text"):
-                            self.unlock_component("hint_text")
-
-                        hovered = True
-                        break
-
-                for item in self.inventory_display.armor_components:
-                    if item.render_position.x <= mouse_position.x <= item.render_position.x + 96 * Texture.UIScale and \
-                       item.render_position.y <= mouse_position.y <= item.render_position.y + 96 * Texture.UIScale:
-                        lines = [
-                            item.item.name,
-                            "",
-                            f"Weight: {item.item.weight}",
-                            f"Protection: {item.item.protection}",
-                            f"Slot: {item.item.slot}"
-                        ]
-                        self.hint_text.set_text(lines)
-
-                        self.hint_box.render_position = mouse_position
-                        self.hint_text.render_position = mouse_position
-
-                        if self.is_locked("hint_box"):
-                            self.unlock_component("hint_box")
-                        if self.is_locked("hint_text"):
-                            self.unlock_component("hint_text")
-
-                        hovered = True
-                        break
-
-                if self.inventory_display.weapon_component.render_position.x <= mouse_position.x <= self.inventory_display.weapon_component.render_position.x + 96 * Texture.UIScale and \
-                   self.inventory_display.weapon_component.render_position.y <= mouse_position.y <= self.inventory_display.weapon_component.render_position.y + 96 * Texture.UIScale:
-                    lines = [
-                        self.inventory_display.weapon_component.item.name,
-                        "",
-                        f"Weight: {self.inventory_display.weapon_component.item.weight}",
-                        f"Damage: {self.inventory_display.weapon_component.item.damage}"
-                    ]
-
-                    self.hint_text.set_text(lines)
-
-                    self.hint_box.render_position = mouse_position
-                    self.hint_text.render_position = mouse_position
-
-                    if self.is_locked("hint_box"):
-                        self.unlock_component("hint_box")
-                    if self.is_locked("hint_text"):
-                        self.unlock_component("hint_text")
-
-                    hovered = True
-
-                if not hovered:
-                    if not self.is_locked("hint_box"):
-                        self.lock_component("hint_box")
-                    if not self.is_locked("hint_text"):
-                        self.lock_component("hint_text")
+        # Only the last position of the mouse matters, however many times it moved. The hint is also checked when the
+        # inventory changes, as the hovered item may have been moved.
+        if not any(e.type == MOUSEMOTION for e in events) and self.hint_version == self.player.inventory.version:
+            return
+        self.hint_version = self.player.inventory.version
+
+        mouse_position = Position(mouse.get_pos()[0], mouse.get_pos()[1])
+        slot = self.inventory_display.get_slot(mouse_position)
+        if slot is None:
+            self.hovered = None
+            if not self.is_locked("hint_box"):
+                self.lock_component("hint_box")
+            if not self.is_locked("hint_text"):
+                self.lock_component("hint_text")
+            return
+
+        item = self.inventory_display.get_slot_component(slot).item
+        if self.hovered != (slot, item):
+            self.hovered = (slot, item)
+            self.hint_text.set_text(self.describe(slot[0], item))
+
+        self.hint_box.render_position = mouse_position
+        self.hint_text.render_position = mouse_position
+        if self.is_locked("hint_box"):
+            self.unlock_component("hint_box")
+        if self.is_locked("hint_text"):
+            self.unlock_component("hint_text")
+
+    @staticmethod
+    def describe(kind: str, item: Item) -> list[str]:
+        """ Get the lines of the hint describing the item of a slot.
+
+        :param kind: The kind of the slot ("misc", "armor" or "weapon").
+        :param item: The item in the slot.
+        :return: The lines describing the item.
+        """
+        lines = [item.name, "", f"Weight: {item.weight}"]
+        if kind == "armor":
+            lines.append(f"Protection: {item.protection}")
+            lines.append(f"Slot: {item.slot}")
+        elif isinstance(item, Weapon):
+            lines.append(f"Damage: {item.damage}")
+        elif isinstance(item, Armor):
+            lines.append(f"Protection: {item.protection}")
+        elif isinstance(item, Consumable):
+            lines.append(f"Effects: {', '.join(item.effect_names)}")
+        return lines
 
     def render(self, surface: Surface) -> None:
         """ Renders the inventory layer.
@@ -42,6 +42,13 @@ class ItemComponent(Component):
         super().__init__(render_position, self.texture.get_width(), self.texture.get_height())
         self.item = item
 
+    def get_state(self) -> object:
+        """ Get a description of how the item looks.
+
+        :return: The texture of the item.
+        """
+        return self.texture
+
     def update(self, events: list[event.Event]) -> None:
         """ Updates the item.
 
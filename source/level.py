@@ -6,11 +6,13 @@ Classes:
 """
 
 from random import Random
-from math import ceil, floor
-from pygame import Surface, event
+from pygame import Surface, Rect, event
 from source.core.tools import Position, Direction
 from source.core.component import Component
+from source.core.graph import GridGraph
 from source.core.texture import Texture
+from source.core.tilemap import TileMap
+from source.core.tiles import Tile, TileGrid
 from source.resources import TEXTURES as T
 from source.core.layer import Layer
 from source.player import Player, ExploringPlayerComponent
@@ -24,6 +26,9 @@ class Level:
     A level is the maze-exploration part of the game. It contains a navigable graph, rooms, and stairs to go down a
     level.
     """
+    ExactDifficulty = 64
+    MazeBudget = 2 ** 21
+
     def __init__(self, difficulty: int, rng: Random) -> None:
         """
         :param difficulty: How complex the level is to navigate.
@@ -32,9 +37,10 @@ class Level:
         self.difficulty = difficulty
         self.rng = rng
 
-        self.graph: dict[Position, list[Position]] = {}
+        self.graph = GridGraph()
         self.rooms: list[Position] = []
         self.stairs: list[Position] = []
+        self.tiles = TileGrid(0, 0, 0, 0)
 
         self.generate()
 
@@ -45,48 +51,68 @@ class Level:
         self._generate_maze(Position(0, 0), Direction.NORTH, 8 + self.difficulty * 4)
         self._generate_rooms()
         self._generate_stairs()
+        self._generate_tiles()
 
-    def _generate_maze(self, start: Position, direction: Direction, length: int) -> None:
-        """ Generates recursively the level's maze.
+    def get_openings(self, position: Position) -> list[Direction]:
+        """ Get the directions in which a position of the maze has a path.
 
-        :param start: The position at which the rng process should start (or continue).
-        :param direction: The direction in which the rng is going to continue.
-        :param length: The amount of steps left in the grid the path can take.
+        :param position: A position of the maze.
+        :return: The directions of the paths starting from the position.
         """
-        if length == 0:
-            return
-
-        if start not in self.graph:
-            self.graph[start] = []
-
-        continued_direction = direction
-        continued_position = start.next_in_direction(direction)
-
-        if start.x % 2 == 0 and start.y % 2 == 0:
-            if self.rng.random() < 0.25:
-                continued_direction = self.rng.choice(continued_direction.possible_turns())
-                continued_position = start.next_in_direction(continued_direction)
-            elif self.rng.random() < 0.10:
-                new_path_direction = self.rng.choice(continued_direction.possible_turns())
-                new_path_position = start.next_in_direction(new_path_direction)
-
-                if new_path_position not in self.graph:
-                    self.graph[new_path_position] = []
-                if new_path_position not in self.graph[start]:
-                    self.graph[start].append(new_path_position)
-                if start not in self.graph[new_path_position]:
-                    self.graph[new_path_position].append(start)
+        return [p.direction_of(position) for p in self.graph[position]]
 
-                self._generate_maze(new_path_position, new_path_direction, length - 1)
-
-        if continued_position not in self.graph:
-            self.graph[continued_position] = []
-        if continued_position not in self.graph[start]:
-            self.graph[start].append(continued_position)
-        if start not in self.graph[continued_position]:
-            self.graph[continued_position].append(start)
-
-        self._generate_maze(continued_position, continued_direction, length - 1)
+    def _generate_maze(self, start: Position, direction: Direction, length: int) -> None:
+        """ Generates the level's maze, by walking a path which randomly turns and branches out. Branches are walked
+        entirely before the path they started from continues, using a stack of the paths left to continue instead of
+        recursion, so that the maze's length is not limited by the recursion limit.
+
+        Every branch walks as many steps as the path it started from has left, so the amount of steps grows
+        exponentially with the difficulty: some seeds already take millions of steps around difficulty 64. Up to
+        `Level.ExactDifficulty` the walk is never cut short, so the maze is the same as the recursive generator's. Past
+        it, the walk stops after `Level.MazeBudget` steps, so that generating a level takes a bounded amount of time
+        however deep it is.
+
+        :param start: The position at which the rng process should start.
+        :param direction: The direction in which the rng is going to start.
+        :param length: The amount of steps in the grid the path can take.
+        """
+        # Each path left to continue: the position it comes from, the position it continues at, its direction, and
+        # the amount of steps it has left.
+        paths: list[tuple[Position, Position, Direction, int]] = [(None, start, direction, length)]
+        # A negative budget never runs out.
+        budget = -1 if self.difficulty <= Level.ExactDifficulty else Level.MazeBudget
+
+        while paths:
+            origin, start, direction, length = paths.pop()
+            if origin is not None:
+                self.graph.connect(origin, start)
+            elif length > 0:
+                self.graph.add(start)
+
+            while length > 0:
+                if budget == 0:
+                    return
+                budget -= 1
+
+                continued_direction = direction
+                continued_position = start.next_in_direction(direction)
+
+                if start.x % 2 == 0 and start.y % 2 == 0:
+                    if self.rng.random() < 0.25:
+                        continued_direction = self.rng.choice(continued_direction.possible_turns())
+                        continued_position = start.next_in_direction(continued_direction)
+                    elif self.rng.random() < 0.10:
+                        new_path_direction = self.rng.choice(continued_direction.possible_turns())
+                        new_path_position = start.next_in_direction(new_path_direction)
+
+                        self.graph.connect(start, new_path_position)
+
+                        paths.append((start, continued_position, continued_direction, length - 1))
+                        start, direction, length = new_path_position, new_path_direction, length - 1
+                        continue
+
+                self.graph.connect(start, continued_position)
+                start, direction, length = continued_position, continued_direction, length - 1
 
     def _generate_rooms(self) -> None:
         """
@@ -102,9 +128,9 @@ class Level:
         for position in self.graph:
             if position == Position(0, 0):
                 continue
-            elif len(self.graph[position]) >= 3:
+            elif self.graph.degree(position) >= 3:
                 best_positions.append(position)
-            elif len(self.graph[position]) == 2 and position.x % 2 == 0 and position.y % 2 == 0:
+            elif self.graph.degree(position) == 2 and position.x % 2 == 0 and position.y % 2 == 0:
                 possible_positions.append(position)
 
         if not best_positions:
@@ -130,7 +156,7 @@ class Level:
         for position in self.graph:
             if position == Position(0, 0):
                 continue
-            elif len(self.graph[position]) == 1:
+            elif self.graph.degree(position) == 1:
                 dead_ends.append(position)
 
         if 1 <= len(dead_ends) <= 2:
@@ -143,6 +169,19 @@ class Level:
                 self.rooms.remove(self.stairs[0])
 
 
+    def _generate_tiles(self) -> None:
+        """
+        Classifies the tiles of the level, once everything has been placed in it.
+        """
+        self.tiles = TileGrid(self.graph.x, self.graph.y, self.graph.width, self.graph.height)
+        for position in self.graph:
+            self.tiles.set(position, Tile.FLOOR)
+        for room in self.rooms:
+            self.tiles.set(room, Tile.ROOM)
+        for stairs in self.stairs:
+            self.tiles.set(stairs, Tile.STAIRS, stairs.direction_of(self.graph[stairs][0]).opposite())
+
+
 class LevelComponent(Component):
     """
     Contains a level.
@@ -163,6 +202,7 @@ class LevelComponent(Component):
         self.stairs_texture = T.get("stairs")
         self.floor_texture = T.get("floor")
         self.brick_texture = T.get("brick")
+        self.tile_map: TileMap = None
 
     def update(self, events: list[event.Event]) -> None:
         """ Updates the level with the latest events.
@@ -172,38 +212,37 @@ class LevelComponent(Component):
         pass
 
     def render(self, surface: Surface) -> None:
-        """ Renders the level to the specified surface.
+        """ Renders the level to the specified surface. The static tiles come from the tile map, only the rooms are
+        rendered one by one.
 
         :param surface: The surface on which to render the level.
         """
-        width_blocks: int = ceil(self.render_width / Texture.TileSize)
-        if width_blocks % 2 == 0:
-            width_blocks += 1
-        height_blocks: int = ceil(self.render_height / Texture.TileSize)
-        if height_blocks % 2 == 0:
-            height_blocks += 1
-
-        offset_x = self.render_position.x - (width_blocks * Texture.TileSize - self.render_width) // 2
-        offset_y = self.render_position.y - (height_blocks * Texture.TileSize - self.render_height) // 2
-
-        for x in range(self.center.x - floor(width_blocks / 2), self.center.x + ceil(width_blocks / 2)):
-            for y in range(self.center.y - floor(height_blocks / 2), self.center.y + ceil(height_blocks / 2)):
-                if Position(x, y) in self.level.rooms:
-                    self.room_texture.render(surface, Position(offset_x, offset_y))
-                elif Position(x, y) in self.level.stairs:
-                    self.stairs_texture.render(
-                        surface,
-                        Position(offset_x, offset_y),
-                        Position(x, y).direction_of(self.level.graph[Position(x, y)][0]).opposite()
-                    )
-                elif Position(x, y) in self.level.graph:
-                    self.floor_texture.render(surface, Position(offset_x, offset_y))
-                else:
-                    self.brick_texture.render(surface, Position(offset_x, offset_y))
-
-                offset_y += Texture.TileSize
-            offset_y = self.render_position.y - (height_blocks * Texture.TileSize - self.render_height) // 2
-            offset_x += Texture.TileSize
+        if self.tile_map is None or self.tile_map.source is not self.level:
+            bounds = Rect(self.level.graph.x, self.level.graph.y, self.level.graph.width, self.level.graph.height)
+            self.tile_map = TileMap(self.level, bounds, self._get_tile, self.brick_texture)
+
+        origin, area = TileMap.get_view(self.center, self.render_position, self.render_width, self.render_height)
+        self.tile_map.render(surface, origin, area)
+
+        for room in self.level.rooms:
+            position = Position(origin.x + room.x * Texture.TileSize, origin.y + room.y * Texture.TileSize)
+            if area.collidepoint(position.x, position.y):
+                self.room_texture.render(surface, position)
+
+    def _get_tile(self, x: int, y: int) -> tuple[Texture, Direction]:
+        """ Get the static tile of the level at some coordinates. Rooms are on the floor, and rendered above it.
+
+        :param x: The x coordinate of the tile.
+        :param y: The y coordinate of the tile.
+        :return: The texture of the tile, and its orientation.
+        """
+        position = Position(x, y)
+        tile = self.level.tiles[position]
+        if tile == Tile.STAIRS:
+            return self.stairs_texture, self.level.tiles.get_direction(position)
+        elif tile == Tile.BRICK:
+            return self.brick_texture, Direction.NORTH
+        return self.floor_texture, Direction.NORTH
 
 
 class LevelLayer(Layer):
@@ -237,6 +276,13 @@ class LevelLayer(Layer):
         self.info_box.update(events)
         self.info_text.update(events)
 
+    def get_dirty_rects(self) -> list[Rect]:
+        """ Get the areas of the layer which changed since it was last rendered.
+
+        :return: The whole layer, as the level is animated.
+        """
+        return [Rect(0, 0, self.width, self.height)]
+
     def render(self, surface: Surface) -> None:
         """ Renders the layer to the specified surface.
 
@@ -72,10 +72,12 @@ class LootTable:
 
         self.amount = data["amount"]
         self.rng = rng
+        self.path = path
 
-    def get_items(self) -> list[Item]:
+    def get_items(self, rng: Random = None) -> list[Item]:
         """ Returns a random list of items present in the loot table, based on their drop rate.
 
+        :param rng: The random number generator to draw from, instead of the table's own.
         :return: A list of items, of size equal to the amount specified in the JSON file.
         """
         items = list(self.table.keys())
@@ -85,26 +87,34 @@ class LootTable:
             items.append(None)
             rates.append(1.0 - sum(rates))
 
-        return self.rng.choices(items, weights=rates, k=self.amount)
+        if rng is None:
+            rng = self.rng
+        return rng.choices(items, weights=rates, k=self.amount)
 
-    def get_weapon(self) -> Weapon:
+    def get_weapon(self, rng: Random = None) -> Weapon:
         """ Get a random weapon from the table.
 
+        :param rng: The random number generator to draw from, instead of the table's own.
         :return: A weapon from the table, based on the drop rate of each weapon present in the table.
         """
+        if rng is None:
+            rng = self.rng
         weapons = {i: self.table[i] for i in self.table if isinstance(i, Weapon)}
         if len(weapons) >= 1:
-            return self.rng.choices(list(weapons.keys()), weights=list(weapons.values()), k=1)[0]
+            return rng.choices(list(weapons.keys()), weights=list(weapons.values()), k=1)[0]
         else:
             return None
 
-    def get_armor(self) -> Armor:
+    def get_armor(self, rng: Random = None) -> Armor:
         """ Get a random armor piece from the table.
 
+        :param rng: The random number generator to draw from, instead of the table's own.
         :return: An armor piece from the table, based on the drop rate of each armor piece present in the table.
         """
+        if rng is None:
+            rng = self.rng
         armors = {i: self.table[i] for i in self.table if isinstance(i, Armor)}
         if len(armors) >= 1:
-            return self.rng.choices(list(armors.keys()), weights=list(armors.values()), k=1)[0]
+            return rng.choices(list(armors.keys()), weights=list(armors.values()), k=1)[0]
         else:
             return None
@@ -3,8 +3,9 @@ Classes:
     - MenuLayer
 """
 
-from pygame import event, Surface
+from pygame import event
 from source.core.layer import Layer
+from source.core.texture import TextureComponent
 from source.resources import TEXTURES as T
 from source.ui.text import TextComponent
 from source.core.tools import Position
@@ -18,7 +19,7 @@ class MenuLayer(Layer):
     """
     def __init__(self, width: int, height: int):
         super().__init__(False, width, height)
-        self.background = T.get("menu_background")
+        self.background = TextureComponent(Position(0, 0), T.get("menu_background"))
 
         self.title = TextComponent("resources/font.ttf", 64, (255, 255, 255), Position(0, 0), width, int(height * 0.20), True, 8.0)
         self.title.set_text(["BORING DUNGEON"])
@@ -31,6 +32,13 @@ class MenuLayer(Layer):
         self.button_text = TextComponent("resources/font.ttf", 24, (255, 255, 255), Position((width - 256) // 2, int(height * 0.50)), 256, 48)
         self.button_text.set_text(["Play!"])
 
+        self.add_component("background", self.background)
+        self.add_component("title", self.title)
+        self.add_component("input_hint", self.input_hint)
+        self.add_component("input", self.input)
+        self.add_component("button", self.button)
+        self.add_component("button_text", self.button_text)
+
     def update(self, events: list[event.Event]) -> None:
         """ Updates the menu.
 
@@ -38,26 +46,7 @@ class MenuLayer(Layer):
         """
         super().update(events)
 
-        self.title.update(events)
-        self.input_hint.update(events)
-        self.input.update(events)
-
-        self.button.update(events)
         if self.button.is_hovered and self.button_text.color == (255, 255, 255):
             self.button_text.set_color((0, 0, 0))
         elif not self.button.is_hovered and self.button_text.color == (0, 0, 0):
             self.button_text.set_color((255, 255, 255))
-        self.button_text.update(events)
-
-    def render(self, surface: Surface) -> None:
-        """ Renders the menu to the specified surface.
-
-        :param surface: The surface on which the menu will be rendered.
-        """
-        super().render(surface)
-        self.background.render(surface, Position(0, 0))
-        self.title.render(surface)
-        self.input_hint.render(surface)
-        self.input.render(surface)
-        self.button.render(surface)
-        self.button_text.render(surface)
@@ -11,6 +11,7 @@ from source.traits.fighter import Fighter
 from source.traits.mobile import Mobile
 from source.traits.effect import Affectible
 from source.core.tools import Position, Direction
+from source.core.graph import GridGraph
 from source.core.component import Component
 from source.resources import TEXTURES as T
 
@@ -19,7 +20,7 @@ class Player(Fighter, Mobile, Affectible):
     """
     The representation of the player in the game.
     """
-    def __init__(self, max_health: int, speed: int, position: Position, direction: Direction, graph: dict[Position, list[Position]]) -> None:
+    def __init__(self, max_health: int, speed: int, position: Position, direction: Direction, graph: GridGraph) -> None:
         """
         :param max_health: The maximum amount of health the player can have.
         :param speed: The base attack speed of the player.
@@ -50,6 +51,7 @@ class Player(Fighter, Mobile, Affectible):
             self.speed += 1
         else:
             self.exp_amount += amount
+        self.notify()
 
 
 class ExploringPlayerComponent(Component):
@@ -2,9 +2,12 @@
 
 Constants:
     - TEXTURES
+    - FONTS
 """
 
 from source.core.texture import TextureBook
+from source.core.font import FontBook
 
 
 TEXTURES = TextureBook()
+FONTS = FontBook()
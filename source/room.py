@@ -2,50 +2,71 @@
 Classes:
     - Room
     - RoomComponent
+Functions:
+    - generate_room
+    - generate_rooms
+    - create_room_pool
+    - init_room_worker
 """
 
+from __future__ import annotations
 from random import Random
+from concurrent.futures import Executor, ProcessPoolExecutor
 from time import time
-from math import ceil, floor
-from pygame import event, Surface
-from source.core.tools import Position, Direction
+from pygame import event, Surface, Rect
+from source.core.tools import Position, Direction, derive_rng
 from source.core.component import Component
+from source.core.graph import GridGraph
+from source.core.pathfinding import DistanceField
 from source.core.texture import Texture
+from source.core.tilemap import TileMap
+from source.core.tiles import Tile, TileGrid
 from source.resources import TEXTURES as T
 from source.core.layer import Layer
 from source.player import Player, ExploringPlayerComponent
 from source.ui.halo import HaloComponent
 from source.ui.box import BoxComponent
 from source.ui.text import TextComponent
-from source.loot import LootTable
+from source.level import Level
+from source.loot import ITEMS, LootTable
 from source.item import Item
 from source.enemy import Enemy, RoamingEnemyComponent
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class Room:
     """
     Rooms are placed inside of levels, they contain items to loot and enemies to fight.
     """
-    def __init__(self, difficulty: int, generation_rng: Random, ai_rng: Random, loot_table: LootTable, openings: list[Direction]) -> None:
+    def __init__(self, difficulty: int, generation_rng: Random, ai_rng: Random, loot_table: LootTable, openings: list[Direction], generate: bool = True) -> None:
         """
         :param difficulty: How complex and big the room is.
         :param generation_rng: The random number generator used the generation process.
+        :param generate: False if the room must be left empty, to be filled by deserialize.
         """
         self.difficulty = difficulty
         self.rng = generation_rng
 
         self.width = 0
         self.height = 0
-        self.graph: dict[Position, list[Position]] = {}
+        self.graph = GridGraph()
 
         self.openings = openings
         self.doors: dict[Position, Direction] = {}
         self.loot_table = loot_table
         self.items: dict[Position, Item] = {}
         self.ai_rng = ai_rng
+        self.enemy_graph = GridGraph()
         self.enemies: list[Enemy] = []
+        self.player_field = DistanceField(self.enemy_graph)
+        self.tiles = TileGrid(0, 0, 0, 0)
 
-        self.generate()
+        if generate:
+            self.generate()
 
     def generate(self) -> None:
         """
@@ -55,6 +76,9 @@ class Room:
         self._generate_doors()
         self._generate_items()
         self._generate_enemies()
+        self._generate_tiles()
+
+        self.player_field = DistanceField(self.enemy_graph)
 
     def _generate_room(self) -> None:
         """
@@ -63,27 +87,21 @@ class Room:
         self.width = self.rng.randint(8, 8 + self.difficulty * 2)
         self.height = self.rng.randint(8, 8 + self.difficulty * 2)
 
-        for x in range(self.width):
-            for y in range(self.height):
-                if Position(x, y) not in self.graph:
-                    self.graph[Position(x, y)] = []
-
-                if y != 0:
-                    self.graph[Position(x, y)].append(Position(x, y).next_in_direction(Direction.NORTH))
-                if x != self.width - 1:
-                    self.graph[Position(x, y)].append(Position(x, y).next_in_direction(Direction.EAST))
-                if y != self.height - 1:
-                    self.graph[Position(x, y)].append(Position(x, y).next_in_direction(Direction.SOUTH))
-                if x != 0:
-                    self.graph[Position(x, y)].append(Position(x, y).next_in_direction(Direction.WEST))
-
-        deletions = self.rng.sample(list(self.graph.keys()), self.rng.randint(int(self.width * self.height * 0.10), int(self.width * self.height * 0.50)))
-        for deletion in deletions:
-            if 0 < deletion.x < self.width - 1 and 0 < deletion.y < self.height - 1:
-                for direction in Direction:
-                    if deletion.next_in_direction(direction) in self.graph:
-                        self.graph[deletion.next_in_direction(direction)].remove(deletion)
-                self.graph.pop(deletion)
+        # Only the inner cells can be deleted, the cells are indexed column by column like the positions were sampled.
+        deletions = self.rng.sample(range(self.width * self.height), self.rng.randint(int(self.width * self.height * 0.10), int(self.width * self.height * 0.50)))
+        if numpy is not None:
+            cells = numpy.ones((self.width, self.height), dtype=bool)
+            x, y = numpy.divmod(numpy.fromiter(deletions, int, len(deletions)), self.height)
+            inner = (x > 0) & (x < self.width - 1) & (y > 0) & (y < self.height - 1)
+            cells[x[inner], y[inner]] = False
+        else:
+            cells = bytearray(b"\x01") * (self.width * self.height)
+            for deletion in deletions:
+                x, y = divmod(deletion, self.height)
+                if 0 < x < self.width - 1 and 0 < y < self.height - 1:
+                    cells[deletion] = 0
+
+        self.graph = GridGraph.from_grid(0, 0, self.width, self.height, cells, 1)
 
     def _generate_doors(self) -> None:
         """
@@ -101,18 +119,15 @@ class Room:
                 position = Position(-1, self.rng.randint(0, self.height - 1))
 
             self.doors[position] = opening
-            self.graph[position] = [position.next_in_direction(opening.opposite())]
-            self.graph[position.next_in_direction(opening.opposite())].append(position)
+            self.graph.connect(position, position.next_in_direction(opening.opposite()))
 
     def _generate_items(self) -> None:
         """
         Generates the items in the room, based on the provided loot table.
         """
-        items = self.loot_table.get_items()
+        items = self.loot_table.get_items(self.rng)
 
-        available_spots = list(self.graph.keys())
-        for door in self.doors:
-            available_spots.remove(door)
+        available_spots = [position for position in self.graph.keys() if position not in self.doors]
         spots = self.rng.sample(available_spots, len(items))
 
         self.items = {spots[i]: items[i] for i in range(len(items)) if items[i] is not None}
@@ -122,19 +137,184 @@ class Room:
             self.enemies = []
             return
 
-        enemy_graph = {p: [l for l in self.graph[p] if l not in self.doors] for p in self.graph if p not in self.doors}
+        self.enemy_graph = self.graph.copy()
+        for door in self.doors:
+            self.enemy_graph.remove(door)
+        spots = self.enemy_graph.keys()
         self.enemies = [Enemy(
             self.rng.randint(5 + self.difficulty, 5 + self.difficulty * 2),
             self.rng.randint(1, 1 + self.difficulty),
-            self.rng.choice(list(enemy_graph.keys())),
+            self.rng.choice(spots),
             self.rng.choice(list(Direction)),
-            enemy_graph,
+            self.enemy_graph,
             self.ai_rng
         ) for _ in range(0, self.rng.randint(0, self.difficulty // 2))]
 
         for enemy in self.enemies:
-            enemy.inventory.set_weapon(self.loot_table.get_weapon(), False)
-            enemy.inventory.set_armor(self.loot_table.get_armor(), False)
+            enemy.inventory.set_weapon(self.loot_table.get_weapon(self.rng), False)
+            enemy.inventory.set_armor(self.loot_table.get_armor(self.rng), False)
+
+    def _generate_tiles(self) -> None:
+        """
+        Classifies the tiles of the room. Items are left out, as they can be picked up and dropped.
+        """
+        self.tiles = TileGrid(self.graph.x, self.graph.y, self.graph.width, self.graph.height)
+        for position in self.graph:
+            self.tiles.set(position, Tile.FLOOR)
+        for door in self.doors:
+            self.tiles.set(door, Tile.DOOR, door.direction_of(self.graph[door][0]))
+
+    def serialize(self) -> tuple:
+        """ Get the generated content of the room as plain values, so that it can be cheaply sent to another process.
+        Items are referred to by their names.
+
+        :return: The difficulty, size, graph, doors, items and enemies of the room.
+        """
+        return (
+            self.difficulty,
+            self.width,
+            self.height,
+            self.graph,
+            [(position.x, position.y, direction.value) for position, direction in self.doors.items()],
+            [(position.x, position.y, item.name) for position, item in self.items.items()],
+            [(
+                enemy.max_health,
+                enemy.speed,
+                enemy.position.x,
+                enemy.position.y,
+                enemy.direction.value,
+                None if enemy.inventory.weapon is None else enemy.inventory.weapon.name,
+                [armor.name for armor in enemy.inventory.armor.values() if armor is not None]
+            ) for enemy in self.enemies]
+        )
+
+    @staticmethod
+    def deserialize(data: tuple, ai_rng: Random, loot_table: LootTable, openings: list[Direction]) -> Room:
+        """ Rebuilds a room from its serialized content, without generating it again.
+
+        :param data: The content of the room, as returned by serialize.
+        :param ai_rng: The random number generator used for the 'AI' of the enemies.
+        :param loot_table: The loot table the room was generated from.
+        :param openings: The directions in which the room has doors.
+        :return: A room identical to the one which was serialized.
+        """
+        difficulty, width, height, graph, doors, items, enemies = data
+        room = Room(difficulty, None, ai_rng, loot_table, openings, False)
+        room.width = width
+        room.height = height
+        room.graph = graph
+        room.doors = {Position(x, y): Direction(direction) for x, y, direction in doors}
+        room.items = {Position(x, y): ITEMS.get(name) for x, y, name in items}
+
+        if difficulty != 1:
+            room.enemy_graph = graph.copy()
+            for door in room.doors:
+                room.enemy_graph.remove(door)
+        for max_health, speed, x, y, direction, weapon, armors in enemies:
+            enemy = Enemy(max_health, speed, Position(x, y), Direction(direction), room.enemy_graph, ai_rng)
+            enemy.inventory.set_weapon(None if weapon is None else ITEMS.get(weapon), False)
+            for armor in armors:
+                enemy.inventory.set_armor(ITEMS.get(armor), False)
+            room.enemies.append(enemy)
+
+        room._generate_tiles()
+        room.player_field = DistanceField(room.enemy_graph)
+        return room
+
+
+def generate_room(seed: str, level: Level, position: Position, loot_table: LootTable, ai_rng: Random) -> Room:
+    """ Generates a room of a level. Each room has its own rng, derived from the seed, the difficulty and the room's
+    position, so that a room is the same whichever order (or process) the rooms are generated in.
+
+    :param seed: The seed of the game.
+    :param level: The level in which the room is.
+    :param position: The position of the room inside of the level.
+    :param loot_table: The loot table used to fill the room.
+    :param ai_rng: The random number generator used for the 'AI' of the enemies.
+    :return: The generated room.
+    """
+    return Room(
+        level.difficulty,
+        derive_rng(seed, level.difficulty, position.x, position.y),
+        ai_rng,
+        loot_table,
+        level.get_openings(position)
+    )
+
+
+def generate_rooms(seed: str, level: Level, loot_table: LootTable, ai_rng: Random, executor: Executor = None) -> dict[Position, Room]:
+    """ Generates every room of a level, either one after the other or spread across a pool of processes. The rooms
+    are the same either way.
+
+    :param seed: The seed of the game.
+    :param level: The level of which the rooms have to be generated.
+    :param loot_table: The loot table used to fill the rooms.
+    :param ai_rng: The random number generator used for the 'AI' of the enemies.
+    :param executor: The pool in which the rooms are generated, as created by create_room_pool. If None, the rooms
+    are generated in the current process.
+    :return: Every room of the level, by position.
+    """
+    if executor is None:
+        return {position: generate_room(seed, level, position, loot_table, ai_rng) for position in level.rooms}
+
+    futures = {position: executor.submit(
+        _generate_serialized_room,
+        seed,
+        level.difficulty,
+        position.x,
+        position.y,
+        [opening.value for opening in level.get_openings(position)],
+        loot_table.path
+    ) for position in level.rooms}
+    return {
+        position: Room.deserialize(future.result(), ai_rng, loot_table, level.get_openings(position))
+        for position, future in futures.items()
+    }
+
+
+def create_room_pool(max_workers: int = None, items_path: str = "data/items.json") -> ProcessPoolExecutor:
+    """ Creates a pool of processes ready to generate rooms.
+
+    :param max_workers: The amount of processes of the pool, or None to use every CPU.
+    :param items_path: The path of the JSON file from which the items are loaded in each process.
+    :return: The pool, to give to generate_rooms.
+    """
+    return ProcessPoolExecutor(max_workers, initializer=init_room_worker, initargs=(items_path,))
+
+
+_worker_loot_tables: dict[str, LootTable] = {}
+
+
+def init_room_worker(items_path: str) -> None:
+    """ Loads the items in a process of a room generation pool.
+
+    :param items_path: The path of the JSON file from which the items are loaded.
+    """
+    ITEMS.load(items_path)
+    _worker_loot_tables.clear()
+
+
+def _generate_serialized_room(seed: str, difficulty: int, x: int, y: int, openings: list[int], loot_table_path: str) -> tuple:
+    """ Generates a room inside of a worker process.
+
+    :param seed: The seed of the game.
+    :param difficulty: The difficulty of the level in which the room is.
+    :param x: The x coordinate of the room inside of the level.
+    :param y: The y coordinate of the room inside of the level.
+    :param openings: The values of the directions in which the room has doors.
+    :param loot_table_path: The path of the loot table used to fill the room.
+    :return: The serialized room.
+    """
+    if loot_table_path not in _worker_loot_tables:
+        _worker_loot_tables[loot_table_path] = LootTable(loot_table_path, Random())
+
+    return Room(
+        difficulty,
+        derive_rng(seed, difficulty, x, y),
+        None,
+        _worker_loot_tables[loot_table_path],
+        [Direction(opening) for opening in openings]
+    ).serialize()
 
 
 class RoomComponent(Component):
@@ -157,6 +337,7 @@ class RoomComponent(Component):
         self.floor_texture = T.get("floor")
         self.brick_texture = T.get("brick")
         self.item_texture = T.get("item")
+        self.tile_map: TileMap = None
 
     def update(self, events: list[event.Event]) -> None:
         """ Updates the room with the latest events.
@@ -166,38 +347,38 @@ class RoomComponent(Component):
         pass
 
     def render(self, surface: Surface) -> None:
-        """ Renders the room on the specified surface.
+        """ Renders the room on the specified surface. The static tiles come from the tile map, only the doors and the
+        items are rendered one by one.
 
         :param surface: The surface on which to render the room.
         """
-        width_blocks: int = ceil(self.render_width / Texture.TileSize)
-        if width_blocks % 2 == 0:
-            width_blocks += 1
-        height_blocks: int = ceil(self.render_height / Texture.TileSize)
-        if height_blocks % 2 == 0:
-            height_blocks += 1
-
-        offset_x = self.render_position.x - (width_blocks * Texture.TileSize - self.render_width) // 2
-        offset_y = self.render_position.y - (height_blocks * Texture.TileSize - self.render_height) // 2
-
-        for x in range(self.center.x - floor(width_blocks / 2), self.center.x + ceil(width_blocks / 2)):
-            for y in range(self.center.y - floor(height_blocks / 2), self.center.y + ceil(height_blocks / 2)):
-                if Position(x, y) in self.room.doors:
-                    self.door_texture.render(
-                        surface,
-                        Position(offset_x, offset_y),
-                        Position(x, y).direction_of(self.room.graph[Position(x, y)][0])
-                    )
-                elif Position(x, y) in self.room.items:
-                    self.item_texture.render(surface, Position(offset_x, offset_y))
-                elif Position(x, y) in self.room.graph:
-                    self.floor_texture.render(surface, Position(offset_x, offset_y))
-                else:
-                    self.brick_texture.render(surface, Position(offset_x, offset_y))
-
-                offset_y += Texture.TileSize
-            offset_y = self.render_position.y - (height_blocks * Texture.TileSize - self.render_height) // 2
-            offset_x += Texture.TileSize
+        if self.tile_map is None or self.tile_map.source is not self.room:
+            bounds = Rect(self.room.graph.x, self.room.graph.y, self.room.graph.width, self.room.graph.height)
+            self.tile_map = TileMap(self.room, bounds, self._get_tile, self.brick_texture)
+
+        origin, area = TileMap.get_view(self.center, self.render_position, self.render_width, self.render_height)
+        self.tile_map.render(surface, origin, area)
+
+        for door in self.room.doors:
+            position = Position(origin.x + door.x * Texture.TileSize, origin.y + door.y * Texture.TileSize)
+            if area.collidepoint(position.x, position.y):
+                self.door_texture.render(surface, position, self.room.tiles.get_direction(door))
+
+        for item in self.room.items:
+            position = Position(origin.x + item.x * Texture.TileSize, origin.y + item.y * Texture.TileSize)
+            if self.room.tiles[item] != Tile.DOOR and area.collidepoint(position.x, position.y):
+                self.item_texture.render(surface, position)
+
+    def _get_tile(self, x: int, y: int) -> tuple[Texture, Direction]:
+        """ Get the static tile of the room at some coordinates. Doors and items are on the floor, and rendered above it.
+
+        :param x: The x coordinate of the tile.
+        :param y: The y coordinate of the tile.
+        :return: The texture of the tile, and its orientation.
+        """
+        if self.room.tiles[Position(x, y)] == Tile.BRICK:
+            return self.brick_texture, Direction.NORTH
+        return self.floor_texture, Direction.NORTH
 
 
 class RoomLayer(Layer):
@@ -230,6 +411,7 @@ class RoomLayer(Layer):
         super().update(events)
         self.room_display.update(events)
         self.player_display.update(events)
+        self.room_display.room.player_field.update(self.player_display.player.position)
 
         for i in range(len(self.enemy_displays)):
             self.enemy_displays[i].update(events)
@@ -242,6 +424,7 @@ class RoomLayer(Layer):
                 self.enemy_displays[i].enemy_texture = T.get("enemy_aggro")
                 self.enemy_displays[i].has_target = True
                 self.enemy_displays[i].destination = self.player_display.player.position
+                self.enemy_displays[i].field = self.room_display.room.player_field
 
                 for j in range(len(self.enemy_displays)):
                     if j != i:
@@ -260,6 +443,13 @@ class RoomLayer(Layer):
                 self.last_pickup = time()
                 self.room_display.room.items.pop(self.player_display.player.position)
 
+    def get_dirty_rects(self) -> list[Rect]:
+        """ Get the areas of the layer which changed since it was last rendered.
+
+        :return: The whole layer, as the room is animated.
+        """
+        return [Rect(0, 0, self.width, self.height)]
+
     def render(self, surface: Surface) -> None:
         """ Renders the layer to the specified surface.
 
@@ -3,15 +3,19 @@ Classes:
     - Living
 """
 
+from source.traits.observable import Observable
 
-class Living:
+
+class Living(Observable):
     """
-    A living is an entity which has health, can be damaged and is capable of healing.
+    A living is an entity which has health, can be damaged and is capable of healing. Its observers are notified when
+    its health changes.
     """
     def __init__(self, max_health: int) -> None:
         """
         :param max_health: The maximum amount of health the entity can have.
         """
+        Observable.__init__(self)
         self.max_health = max_health
         self.health = max_health
 
@@ -23,6 +27,7 @@ class Living:
         self.health -= amount
         if self.health < 0:
             self.health = 0
+        self.notify()
 
     def heal(self, amount: int) -> None:
         """ Heal the entity (adds health).
@@ -32,6 +37,7 @@ class Living:
         self.health += amount
         if self.health > self.max_health:
             self.health = self.max_health
+        self.notify()
 
     def is_dead(self) -> bool:
         """ Get if the entity is dead or not.
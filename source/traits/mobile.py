@@ -4,13 +4,15 @@ Classes:
 """
 
 from source.core.tools import Position, Direction
+from source.core.graph import GridGraph
+from source.core.pathfinding import PATHS, DistanceField
 
 
 class Mobile:
     """
     A mobile entity is an entity which can move inside a graph.
     """
-    def __init__(self, position: Position, direction: Direction, graph: dict[Position, list[Position]]) -> None:
+    def __init__(self, position: Position, direction: Direction, graph: GridGraph) -> None:
         """
         :param position: The initial position of the entity inside of the graph.
         :param direction: The initial orientation of the entity.
@@ -32,7 +34,7 @@ class Mobile:
         else:
             self.direction = direction
 
-        if self.position.next_in_direction(direction) in self.graph[self.position]:
+        if self.graph.has_edge(self.position, direction):
             self.position = self.position.next_in_direction(direction)
             return True
         return False
@@ -43,21 +45,7 @@ class Mobile:
         :param position: The position to which it is needed to determine the path.
         :return: True if a path is found, False if not.
         """
-        parents = {self.position: None}
-        opened = [self.position]
-        closed = []
-
-        while opened:
-            temp = opened.pop(0)
-            if temp not in closed:
-                closed.append(temp)
-
-            for neighbor in self.graph[temp]:
-                if neighbor not in opened and neighbor not in closed:
-                    opened.append(neighbor)
-                    parents[neighbor] = temp
-
-        return bool(parents) and position in parents
+        return PATHS.connected(self.graph, self.position, position)
 
     def move_towards(self, position: Position, teleport: bool = False) -> bool:
         """ Calculates a path to the specified position, then moves the entity 1 step towards the position if a valid
@@ -76,29 +64,25 @@ class Mobile:
             else:
                 return False
 
-        parents = {self.position: None}
-        opened = [self.position]
-        closed = []
+        step = PATHS.next_step(self.graph, self.position, position)
+        if step is None:
+            return False
 
-        while opened:
-            temp = opened.pop(0)
-            if temp not in closed:
-                closed.append(temp)
+        self.direction = step.direction_of(self.position)
+        self.position = step
+        return True
 
-            for neighbor in self.graph[temp]:
-                if neighbor not in opened and neighbor not in closed:
-                    opened.append(neighbor)
-                    parents[neighbor] = temp
+    def follow(self, field: DistanceField) -> bool:
+        """ Moves the entity 1 step down a distance field, towards its root. The entity's direction will be changed to
+        match the direction of the step taken.
 
-        if not parents or position not in parents:
+        :param field: The distance field to follow, spread over the graph of the entity.
+        :return: True if the entity could step, False if not.
+        """
+        step = field.next_step(self.position)
+        if step is None:
             return False
 
-        path = []
-        point = position
-        while parents[point] is not None:
-            path = [point] + path
-            point = parents[point]
-
-        self.direction = path[0].direction_of(self.position)
-        self.position = path[0]
+        self.direction = step.direction_of(self.position)
+        self.position = step
         return True
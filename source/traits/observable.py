@@ -0,0 +1,40 @@
+"""
+Classes:
+    - Observable
+"""
+
+from typing import Callable
+from weakref import WeakMethod, ref
+
+
+class Observable:
+    """
+    An observable entity is an entity which tells its observers when it changes. Observers are only weakly referenced,
+    so that observing an entity doesn't keep the observer alive.
+    """
+    def __init__(self) -> None:
+        self.observers: list[ref] = []
+
+    def observe(self, observer: Callable[[], None]) -> None:
+        """ Adds an observer to the entity.
+
+        :param observer: The function called when the entity changes.
+        """
+        self.observers.append(WeakMethod(observer) if hasattr(observer, "__self__") else ref(observer))
+
+    def forget(self, observer: Callable[[], None]) -> None:
+        """ Removes an observer from the entity.
+
+        :param observer: The function which was called when the entity changed.
+        """
+        self.observers = [reference for reference in self.observers if reference() is not None and reference() != observer]
+
+    def notify(self) -> None:
+        """
+        Tells every observer that the entity has changed.
+        """
+        observers = [reference() for reference in self.observers]
+        self.observers = [reference for reference, observer in zip(self.observers, observers) if observer is not None]
+        for observer in observers:
+            if observer is not None:
+                observer()
@@ -28,6 +28,7 @@ class BoxComponent(Component):
         Renders the box to an internal buffer, in order to minimize the time it takes to render it every frame (because
         rendering a box with the adapted size is quite slow to do).
         """
+        self.invalidate()
         self.buffer.fill((0, 0, 0, 0))
 
         self.corner_texture.render(self.buffer, Position(0, 0), Direction.NORTH)
@@ -56,6 +57,13 @@ class BoxComponent(Component):
         if self.render_width != self.buffer.get_width() or self.render_height != self.buffer.get_height():
             self.pre_render()
 
+    def get_state(self) -> object:
+        """ Get a description of how the box looks.
+
+        :return: The size of the box.
+        """
+        return self.render_width, self.render_height
+
     def render(self, surface: Surface) -> None:
         """ Renders the box to the specified surface.
 
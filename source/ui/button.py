@@ -50,6 +50,13 @@ class ButtonComponent(Component):
         else:
             self.is_hovered = False
 
+    def get_state(self) -> object:
+        """ Get a description of how the button looks.
+
+        :return: If the button is hovered, and its color.
+        """
+        return self.is_hovered, self.color
+
     def render(self, surface: Surface) -> None:
         """ Renders the button to the specified surface.
 
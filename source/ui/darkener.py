@@ -35,6 +35,17 @@ class DarkenerComponent(Component):
         """
         pass
 
+    def get_state(self) -> object:
+        """ Get a description of how the dark surface looks.
+
+        :return: The final darkness of the surface, or None while it is changing.
+        """
+        if not self.animated:
+            return 160
+        if not self.done:
+            return None
+        return self.end
+
     def render(self, surface: Surface) -> None:
         """ Renders the dark surface to the specified surface.
 
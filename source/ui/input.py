@@ -4,10 +4,10 @@ Classes:
 """
 
 from pygame import Surface, event, draw, Rect
-from pygame.font import Font
 from source.external.text_input import TextInput
 from source.core.component import Component
 from source.core.tools import Position
+from source.resources import FONTS
 
 
 class InputComponent(Component):
@@ -25,10 +25,11 @@ class InputComponent(Component):
         self.color = color
         self.size = size
 
-        char_length = Font(font, size).render(" ", False, (0, 0, 0)).get_width()
+        char_length = FONTS.get(font, size).render(" ", False, (0, 0, 0)).get_width()
         self.text_input = TextInput(
             font_family=font,
             font_size=size,
+            font_object=FONTS.get(font, size),
             antialias=False,
             text_color=color,
             cursor_color=color,
@@ -57,6 +58,13 @@ class InputComponent(Component):
         """
         self.text_input.clear_text()
 
+    def get_state(self) -> object:
+        """ Get a description of how the input looks.
+
+        :return: The text inside of the input, the position and visibility of the cursor, and the color of the input.
+        """
+        return self.text_input.get_text(), self.text_input.get_cursor_position(), self.text_input.cursor_visible, self.color
+
     def update(self, events: list[event.Event]) -> None:
         """ Updates the input.
 
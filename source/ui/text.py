@@ -1,14 +1,59 @@
 """
 Classes:
+    - TextCache
     - TextComponent
+Constants:
+    - TEXTS
 """
 
+from collections import OrderedDict
 from time import time
 from math import floor
+from typing import Callable
 from pygame.font import Font
-from pygame import Surface, event
+from pygame import Surface, Rect, event, SRCALPHA
 from source.core.component import Component
 from source.core.tools import Position
+from source.resources import FONTS
+from source.traits.observable import Observable
+
+
+class TextCache:
+    """
+    The lines of text rendered lately, kept so that a line rendered again with the same font and color (like a button
+    text changing color on hover) isn't rendered again. The least recently used lines are dropped once there are too
+    many. The surfaces are shared, so they must not be modified.
+    """
+    def __init__(self, cache_size: int = 512) -> None:
+        """
+        :param cache_size: The maximum amount of rendered lines kept.
+        """
+        self.cache_size = cache_size
+        self.cache: OrderedDict[tuple[str, int, tuple[int, int, int], str], Surface] = OrderedDict()
+
+    def render(self, font: Font, font_path: str, font_size: int, color: tuple[int, int, int], text: str) -> Surface:
+        """ Get the render of a line of text, rendering it if it isn't cached.
+
+        :param font: The font used to render the line.
+        :param font_path: The path of the font, to identify it.
+        :param font_size: The size of the font, to identify it.
+        :param color: The color of the text.
+        :param text: The line of text.
+        :return: The rendered line.
+        """
+        key = (font_path, font_size, tuple(color), text)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        rendered = font.render(text, False, color)
+        self.cache[key] = rendered
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return rendered
+
+
+TEXTS = TextCache()
 
 
 class TextComponent(Component):
@@ -28,21 +73,61 @@ class TextComponent(Component):
         """
         super().__init__(render_position, render_width, render_height)
 
-        self.font = Font(font, size)
+        self.font_path = font
+        self.font_size = size
+        self.font = FONTS.get(font, size)
         self.color = color
         self.lines: list[str] = []
         self.rendered_lines: list[Surface] = []
 
         self.animated = animated
         self.current_lines: list[str] = []
+        self.buffers: list[Surface] = []
         self.speed = speed
         self.apparition_time = -1
 
+        self.sources: list[Observable] = []
+        self.formatter: Callable[[], list[str]] = None
+
+    def bind(self, sources: list[Observable], formatter: Callable[[], list[str]]) -> None:
+        """ Ties the text to some entities: the text is formatted again whenever one of them changes, and only rendered
+        again if the formatted text is different.
+
+        :param sources: The entities from which the text is formatted.
+        :param formatter: The function formatting the lines of the text.
+        """
+        self.unbind()
+        self.sources = sources
+        self.formatter = formatter
+        for source in self.sources:
+            source.observe(self.refresh)
+        self.refresh()
+
+    def unbind(self) -> None:
+        """
+        Unties the text from the entities it was bound to.
+        """
+        for source in self.sources:
+            source.forget(self.refresh)
+        self.sources = []
+        self.formatter = None
+
+    def refresh(self) -> None:
+        """
+        Formats the text of a bound text again, and changes it if it is different.
+        """
+        if self.formatter is not None:
+            lines = self.formatter()
+            if lines != self.lines:
+                self.set_text(lines)
+
     def set_text(self, lines: list[str]) -> None:
         """ Change the text to display.
 
         :param lines: The lines of text which will be displayed.
         """
+        if not self.animated and lines == self.lines:
+            return
         self.lines = lines
 
         if not self.animated:
@@ -56,16 +141,68 @@ class TextComponent(Component):
 
         :param color: The color of the text.
         """
+        if color == self.color:
+            return
         self.color = color
-        self.pre_render()
+        if not self.animated or self.current_lines == self.lines:
+            self.pre_render()
+        else:
+            # The characters already shown are rendered again in the new color on the next render.
+            self.current_lines = []
 
     def pre_render(self) -> None:
         """
         Renders the text to a buffer.
         """
-        self.rendered_lines = []
-        for line in self.lines:
-            self.rendered_lines.append(self.font.render(line, False, self.color))
+        self.invalidate()
+        self.rendered_lines = [TEXTS.render(self.font, self.font_path, self.font_size, self.color, line) for line in self.lines]
+
+    def reveal(self, amount: int) -> None:
+        """ Renders the characters of the text which appeared since the last render of an animated text, next to the
+        ones which were already shown.
+
+        :param amount: The amount of characters shown, across all the lines.
+        """
+        if not self.current_lines:
+            self.current_lines = ["" for _ in range(len(self.lines))]
+            self.buffers = [Surface(self.font.size(line), SRCALPHA) for line in self.lines]
+            self.rendered_lines = [buffer.subsurface(Rect(0, 0, 0, buffer.get_height())) for buffer in self.buffers]
+
+        for i in range(len(self.lines)):
+            shown = self.lines[i][:amount]
+            amount -= len(shown)
+            if len(shown) > len(self.current_lines[i]):
+                if shown == self.lines[i]:
+                    self.rendered_lines[i] = TEXTS.render(self.font, self.font_path, self.font_size, self.color, shown)
+                else:
+                    start = self.font.size(self.current_lines[i])[0]
+                    self.buffers[i].blit(self.font.render(shown[len(self.current_lines[i]):], False, self.color), (start, 0))
+                    self.rendered_lines[i] = self.buffers[i].subsurface(Rect(0, 0, self.font.size(shown)[0], self.buffers[i].get_height()))
+                self.current_lines[i] = shown
+            if amount <= 0:
+                break
+
+    def get_rect(self) -> Rect:
+        """ Get the area of the surface covered by the text, which can overflow the size of the component.
+
+        :return: The area covered by the component and every line of its text.
+        """
+        area = Rect(self.render_position.x, self.render_position.y, self.render_width, self.render_height)
+        sizes = [self.font.size(line) for line in self.lines]
+        offset = self.render_position.y + (self.render_height - (sum([size[1] + 16 for size in sizes]) - 16)) / 2
+        for width, height in sizes:
+            area.union_ip(Rect(int(self.render_position.x + (self.render_width - width) / 2) - 1, int(offset) - 1, width + 2, height + 2))
+            offset += height + 16
+        return area
+
+    def get_state(self) -> object:
+        """ Get a description of how the text looks.
+
+        :return: The text and its color, or None while the text is appearing.
+        """
+        if self.animated and self.current_lines != self.lines:
+            return None
+        return tuple(self.lines), self.color
 
     def update(self, events: list[event.Event]) -> None:
         """ Updates the text display.
@@ -82,20 +219,7 @@ class TextComponent(Component):
         if self.animated and self.current_lines != self.lines:
             if self.apparition_time == -1:
                 self.apparition_time = time()
-                self.current_lines = ["" for _ in range(len(self.lines))]
-
-            amount = floor((time() - self.apparition_time) * self.speed)
-            for i in range(len(self.lines)):
-                if amount >= len(self.lines[i]):
-                    self.current_lines[i] = self.lines[i]
-                    amount -= len(self.lines[i])
-                else:
-                    self.current_lines[i] = self.lines[i][:amount]
-                    break
-
-            self.rendered_lines = []
-            for line in self.current_lines:
-                self.rendered_lines.append(self.font.render(line, False, self.color))
+            self.reveal(floor((time() - self.apparition_time) * self.speed))
 
         offset = self.render_position.y + (self.render_height - (sum([line.get_height() + 16 for line in self.rendered_lines]) - 16)) / 2
         for line in self.rendered_lines:
@@ -0,0 +1,91 @@
+""" Checks that levels are generated the same way as the original recursive maze generator did. """
+
+import unittest
+from random import Random
+from source.core.tools import Position, Direction
+from source.core.graph import GridGraph
+from source.level import Level
+
+
+def generate_maze(rng: Random, graph: dict[Position, list[Position]], start: Position, direction: Direction, length: int) -> None:
+    """ The original recursive maze generator, used as a reference. """
+    if length == 0:
+        return
+
+    if start not in graph:
+        graph[start] = []
+
+    continued_direction = direction
+    continued_position = start.next_in_direction(direction)
+
+    if start.x % 2 == 0 and start.y % 2 == 0:
+        if rng.random() < 0.25:
+            continued_direction = rng.choice(continued_direction.possible_turns())
+            continued_position = start.next_in_direction(continued_direction)
+        elif rng.random() < 0.10:
+            new_path_direction = rng.choice(continued_direction.possible_turns())
+            new_path_position = start.next_in_direction(new_path_direction)
+
+            if new_path_position not in graph:
+                graph[new_path_position] = []
+            if new_path_position not in graph[start]:
+                graph[start].append(new_path_position)
+            if start not in graph[new_path_position]:
+                graph[new_path_position].append(start)
+
+            generate_maze(rng, graph, new_path_position, new_path_direction, length - 1)
+
+    if continued_position not in graph:
+        graph[continued_position] = []
+    if continued_position not in graph[start]:
+        graph[start].append(continued_position)
+    if start not in graph[continued_position]:
+        graph[continued_position].append(start)
+
+    generate_maze(rng, graph, continued_position, continued_direction, length - 1)
+
+
+class TestLevel(unittest.TestCase):
+    def check_maze(self, seed: str, difficulty: int) -> None:
+        rng = Random()
+        rng.seed(a=seed, version=2)
+        expected: dict[Position, list[Position]] = {}
+        generate_maze(rng, expected, Position(0, 0), Direction.NORTH, 8 + difficulty * 4)
+
+        level_rng = Random()
+        level_rng.seed(a=seed, version=2)
+        level = Level.__new__(Level)
+        level.difficulty = difficulty
+        level.rng = level_rng
+        level.graph = GridGraph()
+        level._generate_maze(Position(0, 0), Direction.NORTH, 8 + difficulty * 4)
+
+        self.assertEqual(set(level.graph.keys()), set(expected.keys()))
+        for position in expected:
+            self.assertEqual(set(level.graph[position]), set(expected[position]))
+        self.assertEqual(level_rng.getstate(), rng.getstate())
+
+    def test_shallow_mazes(self) -> None:
+        for seed in ["", "boring", "dungeon"]:
+            for difficulty in range(1, 31):
+                with self.subTest(seed=seed, difficulty=difficulty):
+                    self.check_maze(seed, difficulty)
+
+    def test_deep_mazes(self) -> None:
+        # Most seeds walk well over a hundred steps per unit of length at these difficulties.
+        for seed, difficulty in [("0", 40), ("1", 40), ("2", 50), ("3", 50), ("4", 50), ("5", 60)]:
+            with self.subTest(seed=seed, difficulty=difficulty):
+                self.check_maze(seed, difficulty)
+
+    def test_bounded_depth(self) -> None:
+        budget = Level.MazeBudget
+        Level.MazeBudget = 1000
+        try:
+            level = Level(Level.ExactDifficulty + 1, Random(0))
+        finally:
+            Level.MazeBudget = budget
+        self.assertLessEqual(len(level.graph), 2 * 1000 + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
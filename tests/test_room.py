@@ -0,0 +1,50 @@
+""" Checks that rooms generated across a pool of processes are the same as the ones generated in the current process. """
+
+import unittest
+from random import Random
+from source.level import Level
+from source.loot import ITEMS, LootTable
+from source.room import Room, generate_rooms, create_room_pool
+from source.batch import generate_stats, _init_worker
+
+
+def describe(room: Room) -> tuple:
+    """ Get the content of a room, with its graphs as sets of edges so that rooms can be compared. """
+    data = room.serialize()
+    edges = lambda graph: {(position, neighbor) for position in graph for neighbor in graph[position]}
+    return (data[:3], edges(room.graph), edges(room.enemy_graph), room.doors, data[4:], room.tiles.kinds, room.tiles.directions)
+
+
+class TestRoom(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        ITEMS.load("data/items.json")
+        cls.pool = create_room_pool(2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.shutdown()
+
+    def test_generate_rooms(self) -> None:
+        loot_table = LootTable("data/loot_tables/01.json", Random())
+        for seed in ["", "boring"]:
+            rng = Random()
+            rng.seed(a=seed, version=2)
+            for difficulty in range(1, 9):
+                level = Level(difficulty, rng)
+                serial = generate_rooms(seed, level, loot_table, Random(0))
+                pooled = generate_rooms(seed, level, loot_table, Random(0), self.pool)
+                with self.subTest(seed=seed, difficulty=difficulty):
+                    self.assertEqual(list(pooled.keys()), list(serial.keys()))
+                    for position in serial:
+                        self.assertEqual(describe(pooled[position]), describe(serial[position]))
+
+    def test_batch(self) -> None:
+        _init_worker("data/items.json", "data/loot_tables")
+        for seed in ["", "dungeon"]:
+            with self.subTest(seed=seed):
+                self.assertEqual(generate_stats(seed, 8, self.pool), generate_stats(seed, 8))
+
+
+if __name__ == '__main__':
+    unittest.main()